@@ -1,4 +1,10 @@
 # Conexion/__init__.py
-from .conexion import get_db_connection
+from .conexion import (
+    get_db_connection, get_pool, pool_stats, PoolTimeout,
+    get_request_connection, release_request_connection, borrow_connection,
+)
 
-__all__ = ["get_db_connection"]
+__all__ = [
+    "get_db_connection", "get_pool", "pool_stats", "PoolTimeout",
+    "get_request_connection", "release_request_connection", "borrow_connection",
+]
@@ -1,15 +1,214 @@
 # Conexion/conexion.py
-import mysql.connector
+# Pool de conexiones MySQL: get_db_connection() entrega una conexión prestada
+# y conn.close() la devuelve al pool (los helpers existentes no cambian).
+import os
+import threading
+import time
+from contextlib import contextmanager
+from queue import LifoQueue, Empty
+
+from flask import g, has_app_context
+
+DB_CONFIG = {
+    "host": os.environ.get("MYSQL_HOST", "127.0.0.1"),
+    "user": os.environ.get("MYSQL_USER", "root"),
+    "password": os.environ.get("MYSQL_PASSWORD", ""),   # pon tu clave si usas
+    "database": os.environ.get("MYSQL_DATABASE", "desarrollo_web"),
+    "port": int(os.environ.get("MYSQL_PORT", 3306)),
+}
+
+# Ajustes del pool (sobrescribibles por variables de entorno)
+POOL_SIZE         = int(os.environ.get("MYSQL_POOL_SIZE", 5))
+POOL_TIMEOUT      = float(os.environ.get("MYSQL_POOL_TIMEOUT", 10))       # seg. esperando conexión libre
+POOL_MAX_LIFETIME = float(os.environ.get("MYSQL_POOL_MAX_LIFETIME", 1800))  # seg. antes de reciclar
+POOL_PING_AFTER   = float(os.environ.get("MYSQL_POOL_PING_AFTER", 5))     # seg. ociosa antes de hacer ping
+
+
+class PoolTimeout(Exception):
+    """No se obtuvo una conexión libre dentro de POOL_TIMEOUT."""
+
+
+class _PooledConnection:
+    """Proxy de la conexión real: close() la devuelve al pool en vez de cerrarla."""
+
+    def __init__(self, pool, raw, created):
+        self._pool = pool
+        self._raw = raw
+        self._created = created
+
+    def __getattr__(self, name):
+        if self.__dict__.get("_raw") is None:
+            raise AttributeError(f"conexión ya devuelta al pool ({name})")
+        return getattr(self._raw, name)
+
+    def close(self):
+        raw = self.__dict__.get("_raw")
+        if raw is not None:
+            self._raw = None
+            self._pool._release(raw, self._created)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __del__(self):
+        # Red de seguridad: una conexión olvidada no debe perder su hueco en el pool
+        try: self.close()
+        except Exception: pass
+
+
+class ConnectionPool:
+    """
+    Pool acotado de conexiones mysql.connector.
+    - size: máximo de conexiones abiertas a la vez.
+    - Al prestar: recicla si superó max_lifetime y hace ping(reconnect) si estuvo ociosa.
+    - stats(): préstamos, timeouts y tiempo de espera en el checkout.
+    """
+
+    def __init__(self, size=POOL_SIZE, timeout=POOL_TIMEOUT, max_lifetime=POOL_MAX_LIFETIME,
+                 ping_after=POOL_PING_AFTER, **connect_kwargs):
+        self.size = max(1, int(size))
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+        self.ping_after = ping_after
+        self.connect_kwargs = connect_kwargs or dict(DB_CONFIG)
+        self.pid = os.getpid()
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._idle = LifoQueue()          # (raw, created, last_used); LIFO mantiene calientes las recientes
+        self._lock = threading.Lock()
+        self._in_use = 0
+        self._stats = {"checkouts": 0, "timeouts": 0, "created": 0, "recycled": 0,
+                       "reconnects": 0, "wait_total_ms": 0.0, "wait_max_ms": 0.0}
+
+    # ---- ciclo de vida de conexiones reales ----
+    def _connect(self):
+        import mysql.connector            # diferido: importar el paquete no carga el driver
+        raw = mysql.connector.connect(**self.connect_kwargs)
+        with self._lock: self._stats["created"] += 1
+        return raw, time.monotonic()
+
+    @staticmethod
+    def _discard(raw):
+        try: raw.close()
+        except Exception: pass
+
+    def _checkout_raw(self):
+        now = time.monotonic()
+        try:
+            raw, created, last_used = self._idle.get_nowait()
+        except Empty:
+            return self._connect()
+        if now - created > self.max_lifetime:
+            self._discard(raw)
+            with self._lock: self._stats["recycled"] += 1
+            return self._connect()
+        if now - last_used > self.ping_after:
+            try:
+                raw.ping(reconnect=True, attempts=1, delay=0)
+            except Exception:
+                self._discard(raw)
+                with self._lock: self._stats["reconnects"] += 1
+                return self._connect()
+        return raw, created
+
+    # ---- API ----
+    def connection(self):
+        t0 = time.perf_counter()
+        if not self._slots.acquire(timeout=self.timeout):
+            with self._lock: self._stats["timeouts"] += 1
+            raise PoolTimeout(f"Sin conexiones MySQL libres tras {self.timeout}s (size={self.size})")
+        wait_ms = (time.perf_counter() - t0) * 1000
+        try:
+            raw, created = self._checkout_raw()
+        except Exception:
+            self._slots.release()
+            raise
+        with self._lock:
+            self._in_use += 1
+            self._stats["checkouts"] += 1
+            self._stats["wait_total_ms"] += wait_ms
+            self._stats["wait_max_ms"] = max(self._stats["wait_max_ms"], wait_ms)
+        return _PooledConnection(self, raw, created)
+
+    def _release(self, raw, created):
+        try:
+            # No devolver al pool una transacción a medias
+            if raw.in_transaction:
+                raw.rollback()
+            reusable = raw.is_connected() and time.monotonic() - created <= self.max_lifetime
+        except Exception:
+            reusable = False
+        if reusable and os.getpid() == self.pid:
+            self._idle.put((raw, created, time.monotonic()))
+        else:
+            self._discard(raw)
+        with self._lock: self._in_use -= 1
+        self._slots.release()
+
+    def stats(self):
+        with self._lock:
+            s = dict(self._stats)
+            s.update(size=self.size, in_use=self._in_use, idle=self._idle.qsize())
+        s["wait_avg_ms"] = s["wait_total_ms"] / s["checkouts"] if s["checkouts"] else 0.0
+        return s
+
+    def close_all(self):
+        while True:
+            try: raw, _, _ = self._idle.get_nowait()
+            except Empty: break
+            self._discard(raw)
+
+
+_POOL = None
+_POOL_LOCK = threading.Lock()
+
+def get_pool():
+    """Pool del proceso actual (se recrea tras fork: los sockets del padre no se comparten)."""
+    global _POOL
+    if _POOL is None or _POOL.pid != os.getpid():
+        with _POOL_LOCK:
+            if _POOL is None or _POOL.pid != os.getpid():
+                _POOL = ConnectionPool()
+    return _POOL
 
 def get_db_connection():
     """
-    Conecta a MySQL (XAMPP). Ajusta si tu contraseña de root no es vacía.
-    DB usada: desarrollo_web
+    Conecta a MySQL (XAMPP) a través del pool. Ajusta DB_CONFIG si tu contraseña de root no es vacía.
+    DB usada: desarrollo_web. Llama a conn.close() para devolverla al pool.
+    """
+    return get_pool().connection()
+
+def pool_stats():
+    return get_pool().stats()
+
+
+# ---- Conexión por petición (Flask g) ----
+def get_request_connection():
+    """Conexión del pool ligada al contexto de Flask; se reutiliza hasta el teardown."""
+    conn = g.get("_mysql_conn")
+    if conn is None:
+        conn = g._mysql_conn = get_db_connection()
+    return conn
+
+def release_request_connection(exc=None):
+    """Para app.teardown_appcontext: devuelve al pool la conexión de la petición."""
+    conn = g.pop("_mysql_conn", None)
+    if conn is not None:
+        conn.close()
+
+@contextmanager
+def borrow_connection():
+    """
+    Dentro de Flask entrega la conexión de la petición (no se cierra al salir);
+    fuera de contexto (scripts, CLI) presta una del pool y la devuelve.
     """
-    return mysql.connector.connect(
-        host="127.0.0.1",
-        user="root",
-        password="",          # pon tu clave si usas
-        database="desarrollo_web",
-        port=3306
-    )
+    if has_app_context():
+        yield get_request_connection()
+        return
+    conn = get_db_connection()
+    try:
+        yield conn
+    finally:
+        conn.close()
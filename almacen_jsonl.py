@@ -0,0 +1,94 @@
+# almacen_jsonl.py
+# Almacén JSON Lines para /json/*: cada alta es una línea añadida al final
+# del archivo (ver buffer_escritura), en vez de reescribir el array completo.
+# Incluye la migración única desde datos.json (array) y la compactación offline.
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, List
+
+from lectores import iter_json_array, iter_lineas_desde
+
+
+def linea(obj: Any) -> bytes:
+    """Un registro serializado como una línea JSON (lo que se añade al archivo)."""
+    return (json.dumps(obj, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+def _escribir_tmp(path: Path, lineas: Iterable[bytes]) -> Path:
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp, "wb") as f:
+        for line in lineas:
+            f.write(line)
+        f.flush()
+        os.fsync(f.fileno())
+    return tmp
+
+
+def _reemplazar(path: Path, lineas: Iterable[bytes]) -> None:
+    """Escribe a un temporal, fsync y os.replace: nunca deja el destino a medias."""
+    os.replace(_escribir_tmp(path, lineas), path)
+
+
+def migrar_desde_array(origen: Path, destino: Path, importados: int = 0) -> Dict[str, int]:
+    """
+    Migración única: datos.json (array) -> datos.jsonl. No toca el archivo de origen.
+    Se publica con os.link, que nunca pisa un destino existente: si otro proceso
+    migró (y quizá ya añadió registros) primero, esta copia se descarta y
+    devuelve migrados=0. `importados` es el checkpoint del array (nº de
+    registros ya importados); "offset" es el mismo punto en bytes del jsonl.
+    """
+    n = escrito = 0
+    offset = None
+    def lineas():
+        nonlocal n, escrito, offset
+        for obj in iter_json_array(origen):
+            if n == importados:
+                offset = escrito
+            n += 1
+            data = linea(obj)
+            escrito += len(data)
+            yield data
+    tmp = _escribir_tmp(destino, lineas())
+    try:
+        os.link(tmp, destino)
+    except FileExistsError:
+        n = 0
+    finally:
+        os.unlink(tmp)
+    return {"migrados": n, "offset": escrito if offset is None else offset}
+
+
+def compactar(path: Path, marcas: List[int] = ()) -> Dict[str, Any]:
+    """
+    Compactación offline: reescribe el archivo sin líneas vacías, corruptas o
+    a medias. `marcas` son offsets antiguos (p. ej. checkpoints de importación);
+    se devuelven traducidos a offsets del archivo nuevo.
+    """
+    marcas = sorted(set(marcas))
+    nuevas: Dict[int, int] = {}
+    stats = {"conservadas": 0, "descartadas": 0}
+    i = 0
+    def lineas():
+        nonlocal i
+        escrito = 0
+        for line, fin in iter_lineas_desde(path, 0):
+            try:
+                data = linea(json.loads(line)) if line.strip() else None
+            except json.JSONDecodeError:
+                data = None
+            if data is None:
+                stats["descartadas"] += 1
+            else:
+                stats["conservadas"] += 1
+                escrito += len(data)
+                yield data
+            while i < len(marcas) and marcas[i] <= fin:
+                nuevas[marcas[i]] = escrito
+                i += 1
+        while i < len(marcas):
+            nuevas[marcas[i]] = escrito
+            i += 1
+    _reemplazar(path, lineas())
+    stats["marcas"] = nuevas
+    return stats
@@ -5,28 +5,73 @@
 #          + SQLAlchemy demo (usuarios.db)
 # ==============================================================
 
-from flask import Flask, render_template, request, redirect, url_for, flash
-import sqlite3, json, csv
+from flask import (
+    Flask, Response, render_template, request, redirect, url_for, flash, session, make_response, g,
+    before_render_template, template_rendered,
+)
+from functools import wraps
+import click
+import hashlib
+import sqlite3, json, csv, base64, time, textwrap, io, threading, logging
 from pathlib import Path
 from datetime import datetime
 from math import ceil
 
+# Conexión SQLite gestionada
+import sqlite_db
+
 # Conexión MySQL
-from Conexion import get_db_connection
+from Conexion import get_db_connection, pool_stats, borrow_connection, release_request_connection
 
 # Login
 from flask_login import (
     LoginManager, login_user, login_required, logout_user, current_user
 )
-from werkzeug.security import check_password_hash
+from hash_claves import hash_claves, Saturado
 
 # Capa de usuarios MySQL (para login)
-from models import User, get_user_by_id, get_user_by_email, create_user
+from models import (User, get_user_cached, aget_user_by_email, create_user, invalidar_usuario, user_cache,
+                    update_password_hash)
+
+# Importación masiva a SQLite
+from importador import BulkImporter, Checkpoint, CHUNK_SIZE, CHECKPOINT_DDL
+from lectores import (
+    iter_lineas, iter_csv, iter_json_array, iter_lineas_desde, iter_csv_desde, iter_jsonl, iter_jsonl_desde
+)
+import almacen_jsonl
+from buffer_escritura import GroupCommitWriter, WriteFailed
+from indice_lineas import LineIndex
+
+# Métricas (Prometheus) y registro de consultas lentas
+from metricas import metricas
+
+# Versiones por tabla y caché de consultas MySQL
+from versiones import versiones, tablas_leidas, tablas_escritas, TODAS
+from cache_consultas import QueryCache
+
+# Búsqueda FTS5 de productos
+from busqueda import crear_fts, buscar_productos
+
+# Totales materializados de la portada
+from totales import crear_totales, leer_totales, ORDEN_COLUMNAS
+
+# Altas / cambios / bajas por lotes (MySQL)
+from lote_mysql import TABLAS as TABLAS_LOTE, aplicar_lote
 
-# Formularios
-from flask_wtf import FlaskForm
-from wtforms import StringField, IntegerField, DecimalField, SubmitField, PasswordField
-from wtforms.validators import DataRequired, Length, NumberRange, Email
+# Deltas de stock atómicos + libro de movimientos (MySQL)
+from stock_mysql import crear_libro, aplicar_deltas
+
+# Sincronización SQLite <-> MySQL de productos
+from sincronizar import SincronizadorProductos, GANADORES
+
+# Exportación en streaming
+from exportar import FORMATOS, filas_sqlite, filas_mysql, stream as export_stream
+
+# Arranque perezoso: formularios (WTForms) y demo SQLAlchemy se importan al usarse
+from subsistemas import Perezoso, Subsistema, estado as estado_subsistemas
+# Vistas MySQL async: consultas independientes en paralelo (requiere Flask[async])
+from asincrono import en_hilo
+formularios = Perezoso("formularios")
 
 app = Flask(__name__)
 app.config["SECRET_KEY"] = "cambia_esta_clave_super_secreta"
@@ -36,17 +81,94 @@ login_manager = LoginManager(app)
 login_manager.login_view = "auth_login"
 login_manager.login_message_category = "warning"
 
+# Una sola conexión MySQL por petición (g), devuelta al pool en el teardown
+app.teardown_appcontext(release_request_connection)
+
 @login_manager.user_loader
 def load_user(user_id: str):
-    return get_user_by_id(int(user_id))
+    return get_user_cached(int(user_id))
+
+@app.route("/auth/cache")
+@login_required
+def auth_cache_stats():
+    return user_cache.stats()
+
+# ---------------------- Métricas (/metrics) ---------------------
+# Latencia por endpoint, render de plantillas y consultas (SQLite gestionado,
+# helpers MySQL, models y el ENGINE de SQLAlchemy), en formato Prometheus.
+# SLOW_QUERY_MS: umbral del registro de consultas lentas (None lo desactiva);
+# SLOW_QUERY_LOG: archivo donde escribirlo (sin él, logger "consultas_lentas").
+app.config.setdefault("SLOW_QUERY_MS", 200)
+app.config.setdefault("SLOW_QUERY_LOG", None)
+_LENTAS_APLICADO = None
+
+def _configurar_lentas():
+    global _LENTAS_APLICADO
+    conf = (app.config["SLOW_QUERY_MS"], app.config["SLOW_QUERY_LOG"])
+    if conf == _LENTAS_APLICADO:
+        return
+    ms, archivo = conf
+    metricas.umbral_lento = ms / 1000 if ms is not None else None
+    log = logging.getLogger("consultas_lentas")
+    for h in [h for h in log.handlers if getattr(h, "_slow_query_log", False)]:
+        log.removeHandler(h); h.close()
+    if archivo:
+        h = logging.FileHandler(archivo, encoding="utf-8")
+        h.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+        h._slow_query_log = True
+        log.addHandler(h)
+    _LENTAS_APLICADO = conf
+
+sqlite_db.observador = lambda path, sql, params, segundos: metricas.consulta(f"sqlite:{path}", sql, params, segundos)
+
+@app.before_request
+def _metricas_inicio():
+    _configurar_lentas()
+    g._t0 = time.perf_counter()
+
+@app.after_request
+def _metricas_fin(resp):
+    t0 = g.pop("_t0", None)
+    if t0 is not None:
+        endpoint = request.endpoint or "sin_endpoint"
+        metricas.observar("http_request_duration_seconds", time.perf_counter() - t0,
+                          endpoint=endpoint, method=request.method)
+        metricas.contar("http_requests_total", endpoint=endpoint, method=request.method,
+                        status=str(resp.status_code))
+    return resp
+
+def _render_inicio(sender, template, context, **extra):
+    g.setdefault("_t_plantillas", []).append(time.perf_counter())
+
+def _render_fin(sender, template, context, **extra):
+    pila = g.get("_t_plantillas")
+    if pila:
+        metricas.observar("template_render_duration_seconds", time.perf_counter() - pila.pop(),
+                          template=template.name or "?")
+
+before_render_template.connect(_render_inicio, app)
+template_rendered.connect(_render_fin, app)
+
+@app.route("/metrics")
+def metrics():
+    texto = metricas.exponer()
+    # Estado del pool MySQL y de la caché de consultas como gauges
+    extra = {f"mysql_pool_{k}": v for k, v in pool_stats().items()}
+    extra.update({f"query_cache_{k}": v for k, v in query_cache.stats().items()})
+    extra.update({f"password_hash_{k}": v for k, v in hash_claves.estado().items()})
+    for nombre, v in extra.items():
+        if isinstance(v, (int, float)) and not isinstance(v, bool):
+            texto += f"# TYPE {nombre} gauge\n{nombre} {v}\n"
+    return Response(texto, mimetype="text/plain; version=0.0.4")
 
 # ---------------------- SQLITE (productos) ----------------------
 DB_PATH = "inventario.db"
 
 def get_conn():
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    return conn
+    """Conexión gestionada (una por hilo, WAL + pragmas; ver sqlite_db). No se cierra."""
+    return sqlite_db.conectar(DB_PATH)
+
+app.teardown_appcontext(sqlite_db.finalizar)
 
 def init_db():
     with get_conn() as conn:
@@ -57,12 +179,31 @@ def init_db():
             cantidad INTEGER NOT NULL CHECK(cantidad>=0),
             precio REAL NOT NULL CHECK(precio>=0)
         )""")
+        # El UPSERT del importador necesita nombre único: fusionar duplicados previos
+        conn.execute("""
+        UPDATE productos SET
+            cantidad = (SELECT SUM(p2.cantidad) FROM productos p2 WHERE p2.nombre = productos.nombre),
+            precio   = (SELECT p2.precio FROM productos p2 WHERE p2.nombre = productos.nombre
+                        ORDER BY p2.id DESC LIMIT 1)
+        WHERE id IN (SELECT MIN(id) FROM productos GROUP BY nombre HAVING COUNT(*) > 1)""")
+        conn.execute("DELETE FROM productos WHERE id NOT IN (SELECT MIN(id) FROM productos GROUP BY nombre)")
+        conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS ux_productos_nombre ON productos(nombre)")
+        conn.execute(CHECKPOINT_DDL)
+        crear_fts(conn)
+        crear_totales(conn)
         conn.commit()
 
+_DB_READY = False
+
+def ensure_db():
+    global _DB_READY
+    if not _DB_READY:
+        init_db()
+        _DB_READY = True
+
 # ---------------------- Archivos de datos -----------------------
 BASE_DIR = Path(__file__).parent
-DATOS_DIR = BASE_DIR / "datos"
-DATOS_DIR.mkdir(exist_ok=True)
+DATOS_DIR = BASE_DIR / "datos"             # se crea al escribir el primer archivo
 
 def _as_int(v, default=1):
     try: return int(v)
@@ -72,6 +213,30 @@ def _as_float(v, default=1.0):
     try: return float(str(v).replace(",", "."))
     except (TypeError, ValueError): return default
 
+# Altas a archivos vía group commit: un write() (y fsync opcional) por lote, con flock
+app.config.setdefault("WRITE_BUFFER_MAX_BYTES", 64 * 1024)
+app.config.setdefault("WRITE_BUFFER_MAX_DELAY", 0.0)    # seg. extra para agrupar más altas por lote
+app.config.setdefault("WRITE_BUFFER_FSYNC", False)      # True: durable al responder (fsync por lote)
+_ESCRITORES = {}
+_ESCRITORES_LOCK = threading.Lock()
+
+def _escritor(path, header=None, on_flush=None):
+    with _ESCRITORES_LOCK:
+        w = _ESCRITORES.get(path)
+        if w is None:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            w = _ESCRITORES[path] = GroupCommitWriter(
+                path, max_bytes=app.config["WRITE_BUFFER_MAX_BYTES"],
+                max_delay=app.config["WRITE_BUFFER_MAX_DELAY"],
+                fsync=app.config["WRITE_BUFFER_FSYNC"], header=header, on_flush=on_flush)
+        return w
+
+@app.errorhandler(WriteFailed)
+def escritura_fallida(e):
+    # El lote de este alta no llegó al archivo (disco lleno, permisos...): no responder "ok"
+    app.logger.error("Alta no escrita: %s", e)
+    return {"ok": False, "msg": "No se pudo guardar el registro; reintenta más tarde."}, 503
+
 TXT_PATH = DATOS_DIR / "datos.txt"
 
 @app.route("/txt/guardar")
@@ -82,15 +247,22 @@ def guardar_txt():
     precio   = _as_float(request.args.get("precio"), 1.0)
     fecha    = datetime.now().isoformat(timespec="seconds")
     linea = f"{fecha} | {nombre} | {cantidad} | {precio:.2f}\n"
-    with open(TXT_PATH, "a", encoding="utf-8") as f:
-        f.write(linea)
+    _escritor(TXT_PATH).append(linea.encode("utf-8"))
     return f"OK TXT → {linea}"
 
 @app.route("/txt/ver")
 @login_required
 def ver_txt():
-    contenido = TXT_PATH.read_text(encoding="utf-8") if TXT_PATH.exists() else "(archivo vacío)"
-    return f"<pre>{contenido}</pre>"
+    if not TXT_PATH.exists():
+        return "<pre>(archivo vacío)</pre>"
+    if request.args.get("todo") != "1":
+        return _visor(TXT_PATH, "txt", "ver_txt")
+    def gen():
+        yield "<pre>"
+        for line in iter_lineas(TXT_PATH):
+            yield line + "\n"
+        yield "</pre>"
+    return Response(gen(), mimetype="text/html")
 
 JSON_PATH = DATOS_DIR / "datos.json"
 
@@ -100,9 +272,54 @@ def _json_load():
         except json.JSONDecodeError: return []
     return []
 
+def _pre_json_array(items):
+    """Mismo formato que json.dumps(lista, indent=2) dentro de <pre>, generado elemento a elemento."""
+    yield "<pre>["
+    vacio = True
+    try:
+        for obj in items:
+            yield ("\n" if vacio else ",\n") + textwrap.indent(json.dumps(obj, ensure_ascii=False, indent=2), "  ")
+            vacio = False
+    except json.JSONDecodeError:
+        pass  # como _json_load: lo que no se puede leer no se muestra
+    yield "]</pre>" if vacio else "\n]</pre>"
+
 def _json_save(data):
+    JSON_PATH.parent.mkdir(parents=True, exist_ok=True)
     JSON_PATH.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
 
+# JSON Lines: "jsonl" (por defecto) añade una línea por alta; "array" mantiene datos.json clásico
+JSONL_PATH = DATOS_DIR / "datos.jsonl"
+app.config.setdefault("JSON_STORE", "jsonl")
+
+def _usa_jsonl():
+    """En modo jsonl migra una sola vez el array existente la primera vez que se usa."""
+    if app.config["JSON_STORE"] != "jsonl":
+        return False
+    if not JSONL_PATH.exists() and JSON_PATH.exists():
+        _migrar_json()
+    return True
+
+def _migrar_json():
+    """
+    datos.json -> datos.jsonl llevándose el checkpoint de importación: el índice
+    de registro del array pasa a ser el offset de esa línea en el jsonl, así
+    /import/json no vuelve a sumar lo ya importado. Devuelve los migrados.
+    """
+    ensure_db()
+    conn = get_conn()
+    importados = Checkpoint(conn, JSON_PATH).desde
+    res = almacen_jsonl.migrar_desde_array(JSON_PATH, JSONL_PATH, importados)
+    if res["migrados"] and importados:
+        cp = Checkpoint(conn, JSONL_PATH)
+        # size=pos y mtime 0: la próxima importación lee desde el offset lo que
+        # otro proceso haya añadido ya, en vez de darse por al día
+        cp.pos = cp.size = res["offset"]
+        cp.mtime_ns = 0
+        cp.save(conn)
+        conn.commit()
+    return res["migrados"]
+
 @app.route("/json/guardar")
 @login_required
 def guardar_json():
@@ -110,18 +327,39 @@ def guardar_json():
     cantidad = _as_int(request.args.get("cantidad"), 1)
     precio   = _as_float(request.args.get("precio"), 1.0)
     fecha    = datetime.now().isoformat(timespec="seconds")
+    registro = {"fecha": fecha, "nombre": nombre, "cantidad": cantidad, "precio": precio}
+    if _usa_jsonl():
+        _escritor(JSONL_PATH).append(almacen_jsonl.linea(registro))
+        # El índice lateral (compartido entre workers) sólo indexa lo añadido desde su última puesta al día
+        return {"ok": True, "total_registros": LineIndex(JSONL_PATH, "jsonl").actualizar()}
     data = _json_load()
-    data.append({"fecha": fecha, "nombre": nombre, "cantidad": cantidad, "precio": precio})
+    data.append(registro)
     _json_save(data)
     return {"ok": True, "total_registros": len(data)}
 
 @app.route("/json/ver")
 @login_required
 def ver_json():
-    data = _json_load()
-    return f"<pre>{json.dumps(data, ensure_ascii=False, indent=2)}</pre>"
+    if _usa_jsonl():
+        if JSONL_PATH.exists() and request.args.get("todo") != "1":
+            return _visor(JSONL_PATH, "jsonl", "ver_json")
+        items = iter_jsonl(JSONL_PATH) if JSONL_PATH.exists() else []
+    elif JSON_PATH.exists():
+        items = iter_json_array(JSON_PATH)
+    else:
+        items = []
+    return Response(_pre_json_array(items), mimetype="text/html")
 
 CSV_PATH = DATOS_DIR / "datos.csv"
+CSV_FIELDS = ["fecha", "nombre", "cantidad", "precio"]
+
+def _csv_bytes(row):
+    """Una fila CSV (o la cabecera si row es None) tal como la escribiría csv.DictWriter."""
+    buf = io.StringIO()
+    w = csv.DictWriter(buf, fieldnames=CSV_FIELDS)
+    if row is None: w.writeheader()
+    else: w.writerow(row)
+    return buf.getvalue().encode("utf-8")
 
 @app.route("/csv/guardar")
 @login_required
@@ -130,12 +368,9 @@ def guardar_csv():
     cantidad = _as_int(request.args.get("cantidad"), 1)
     precio   = _as_float(request.args.get("precio"), 1.0)
     fecha    = datetime.now().isoformat(timespec="seconds")
-
-    write_header = not CSV_PATH.exists() or CSV_PATH.stat().st_size == 0
-    with open(CSV_PATH, "a", newline="", encoding="utf-8") as f:
-        w = csv.DictWriter(f, fieldnames=["fecha", "nombre", "cantidad", "precio"])
-        if write_header: w.writeheader()
-        w.writerow({"fecha": fecha, "nombre": nombre, "cantidad": cantidad, "precio": f"{precio:.2f}"})
+    fila = _csv_bytes({"fecha": fecha, "nombre": nombre, "cantidad": cantidad, "precio": f"{precio:.2f}"})
+    # La cabecera la escribe el propio lote, bajo el lock, si el archivo está vacío
+    _escritor(CSV_PATH, header=_csv_bytes(None)).append(fila)
     return {"ok": True}
 
 @app.route("/csv/ver")
@@ -143,139 +378,217 @@ def guardar_csv():
 def ver_csv():
     if not CSV_PATH.exists() or CSV_PATH.stat().st_size == 0:
         return "<pre>(archivo vacío)</pre>"
-    with open(CSV_PATH, newline="", encoding="utf-8") as f:
-        rows = list(csv.DictReader(f))
-    return f"<pre>{json.dumps(rows, ensure_ascii=False, indent=2)}</pre>"
+    if request.args.get("todo") != "1":
+        return _visor(CSV_PATH, "csv", "ver_csv")
+    return Response(_pre_json_array(iter_csv(CSV_PATH)), mimetype="text/html")
+
+# Visores paginados: ?page=N&per_page=M o ?tail=K leen sólo ese rango vía el índice
+# lateral (datos/*.idx); ?todo=1 vuelca el archivo completo en streaming.
+VISOR_PER_PAGE, VISOR_MAX = 100, 1000
+
+def _visor(path, modo, endpoint):
+    idx = LineIndex(path, modo)
+    try: tail = int(request.args.get("tail", 0))
+    except (TypeError, ValueError): tail = 0
+    if tail > 0:
+        regs, total = idx.cola(min(tail, VISOR_MAX))
+        nav = f"<p>Últimos {len(regs)} de {total} registros</p>"
+    else:
+        page, per_page = get_page_args(default_per_page=VISOR_PER_PAGE, max_per_page=VISOR_MAX)
+        regs, total = idx.pagina(page, per_page)
+        ctx = paginate_context(total, page, per_page, endpoint)
+        nav = "<p class=\"pagination\">"
+        if ctx["prev_url"]: nav += f'<a href="{ctx["prev_url"]}">&laquo; Anterior</a> '
+        nav += f'Página {ctx["page"]} / {ctx["total_pages"]} ({total} registros)'
+        if ctx["next_url"]: nav += f' <a href="{ctx["next_url"]}">Siguiente &raquo;</a>'
+        nav += "</p>"
+    if modo == "txt":
+        cuerpo = "<pre>" + "".join(r + "\n" for r in regs) + "</pre>"
+    else:
+        cuerpo = "".join(_pre_json_array(regs))
+    return nav + cuerpo
 
-# Importadores a SQLite
-def _upsert_producto(nombre: str, cantidad: int, precio: float):
-    if not nombre: return False
-    with get_conn() as conn:
-        row = conn.execute("SELECT id FROM productos WHERE nombre=?", (nombre,)).fetchone()
-        if row:
-            conn.execute(
-                "UPDATE productos SET cantidad = cantidad + ?, precio = ? WHERE id = ?",
-                (max(0, cantidad), max(0.0, precio), row["id"])
-            )
-        else:
-            conn.execute(
-                "INSERT INTO productos(nombre, cantidad, precio) VALUES (?,?,?)",
-                (nombre, max(0, cantidad), max(0.0, precio))
-            )
-        conn.commit()
-    return True
+# Importadores a SQLite (todas las fuentes pasan por BulkImporter)
+app.config.setdefault("IMPORT_CHUNK_SIZE", CHUNK_SIZE)
 
-@app.route("/import/txt")
-@login_required
-def import_txt():
-    if not TXT_PATH.exists():
-        return {"ok": False, "msg": "datos.txt no existe"}
-    procesados = 0
-    for line in TXT_PATH.read_text(encoding="utf-8").splitlines():
+# Los generadores avanzan el checkpoint (cp.pos) antes de entregar cada registro
+def _txt_registros(cp):
+    for line, fin in iter_lineas_desde(TXT_PATH, cp.pos):
+        cp.pos = fin
         parts = [p.strip() for p in line.split("|")]
         if len(parts) != 4: continue
         _, nombre, cant, prec = parts
-        procesados += 1 if _upsert_producto(nombre, _as_int(cant, 0), _as_float(prec, 0.0)) else 0
-    return {"ok": True, "origen": "txt", "procesados": procesados}
-
-@app.route("/import/json")
-@login_required
-def import_json():
-    if not JSON_PATH.exists():
+        yield nombre, _as_int(cant, 0), _as_float(prec, 0.0)
+
+def _json_registros(cp):
+    for i, obj in enumerate(iter_json_array(JSON_PATH)):
+        if i < cp.pos: continue
+        cp.pos = i + 1
+        if not isinstance(obj, dict): continue
+        yield (obj.get("nombre") or "").strip(), _as_int(obj.get("cantidad"), 0), _as_float(obj.get("precio"), 0.0)
+
+def _jsonl_registros(cp):
+    for obj, fin in iter_jsonl_desde(JSONL_PATH, cp.pos):
+        cp.pos = fin
+        if not isinstance(obj, dict): continue
+        yield (obj.get("nombre") or "").strip(), _as_int(obj.get("cantidad"), 0), _as_float(obj.get("precio"), 0.0)
+
+def _csv_registros(cp):
+    for r, fin in iter_csv_desde(CSV_PATH, cp.pos):
+        cp.pos = fin
+        yield (r.get("nombre") or "").strip(), _as_int(r.get("cantidad"), 0), _as_float(r.get("precio"), 0.0)
+
+def _nuevo_importador():
+    ensure_db()
+    return BulkImporter(get_conn, app.config["IMPORT_CHUNK_SIZE"],
+                        on_commit=lambda: versiones.bump({SQLITE_PRODUCTOS}))
+
+_FUENTES = {
+    "txt":  (TXT_PATH, _txt_registros),
+    "json": (JSON_PATH, _json_registros),
+    "jsonl": (JSONL_PATH, _jsonl_registros),
+    "csv":  (CSV_PATH, _csv_registros),
+}
+
+def _importar(imp, origen, reiniciar=False):
+    """
+    Pasa una fuente por el importador desde su último checkpoint
+    (?reiniciar=1 vuelve a leer el archivo entero). Devuelve dict de error o el nº de procesados.
+    """
+    if origen == "txt" and not TXT_PATH.exists():
+        return {"ok": False, "msg": "datos.txt no existe"}
+    if origen == "json" and _usa_jsonl():
+        if not JSONL_PATH.exists():
+            return {"ok": False, "msg": "datos.jsonl no existe"}
+        origen = "jsonl"
+    if origen == "json" and not JSON_PATH.exists():
         return {"ok": False, "msg": "datos.json no existe"}
+    if origen == "csv" and (not CSV_PATH.exists() or CSV_PATH.stat().st_size == 0):
+        return {"ok": False, "msg": "datos.csv vacío o no existe"}
+    path, registros = _FUENTES[origen]
+    cp = imp.checkpoint(path, reiniciar)
+    if cp.al_dia:
+        return 0
     try:
-        data = json.loads(JSON_PATH.read_text(encoding="utf-8"))
+        return imp.run(registros(cp))
     except json.JSONDecodeError:
         return {"ok": False, "msg": "JSON inválido"}
-    procesados = 0
-    for obj in data if isinstance(data, list) else []:
-        nombre = (obj.get("nombre") or "").strip()
-        procesados += 1 if _upsert_producto(nombre, _as_int(obj.get("cantidad"), 0),
-                                            _as_float(obj.get("precio"), 0.0)) else 0
-    return {"ok": True, "origen": "json", "procesados": procesados}
+
+def _import_route(origen):
+    imp = _nuevo_importador()
+    try:
+        res = _importar(imp, origen, request.args.get("reiniciar") == "1")
+    finally:
+        stats = imp.finish()
+    if isinstance(res, dict):
+        return res
+    return {"ok": True, "origen": origen, **stats}
+
+@app.route("/import/txt")
+@login_required
+def import_txt():
+    return _import_route("txt")
+
+@app.route("/import/json")
+@login_required
+def import_json():
+    return _import_route("json")
 
 @app.route("/import/csv")
 @login_required
 def import_csv():
-    if not CSV_PATH.exists() or CSV_PATH.stat().st_size == 0:
-        return {"ok": False, "msg": "datos.csv vacío o no existe"}
-    with open(CSV_PATH, newline="", encoding="utf-8") as f:
-        rows = list(csv.DictReader(f))
-    procesados = 0
-    for r in rows:
-        nombre = (r.get("nombre") or "").strip()
-        procesados += 1 if _upsert_producto(nombre, _as_int(r.get("cantidad"), 0),
-                                            _as_float(r.get("precio"), 0.0)) else 0
-    return {"ok": True, "origen": "csv", "procesados": procesados}
+    return _import_route("csv")
 
 @app.route("/import/all")
 @login_required
 def import_all():
-    res_txt  = import_txt()
-    res_json = import_json()
-    res_csv  = import_csv()
-    def _c(r): return r.get("procesados", 0) if isinstance(r, dict) else 0
-    c_txt, c_json, c_csv = _c(res_txt), _c(res_json), _c(res_csv)
+    # Un solo importador (y una transacción por lote) para las tres fuentes
+    imp = _nuevo_importador()
+    try:
+        reiniciar = request.args.get("reiniciar") == "1"
+        conteos = {o: _importar(imp, o, reiniciar) for o in ("txt", "json", "csv")}
+    finally:
+        stats = imp.finish()
+    c_txt, c_json, c_csv = (c if isinstance(c, int) else 0 for c in conteos.values())
     total = c_txt + c_json + c_csv
-    try: flash(f"Importación: TXT={c_txt}, JSON={c_json}, CSV={c_csv} (Total={total})", "success")
+    try: flash(f"Importación: TXT={c_txt}, JSON={c_json}, CSV={c_csv} (Total={total}, "
+               f"{stats['filas_por_seg']:.0f} filas/s)", "success")
     except Exception: pass
     return redirect(url_for("home"))
 
-# ---------------------- Formularios (Flask-WTF) -----------------
-class ProductoForm(FlaskForm):
-    nombre   = StringField("Nombre", validators=[DataRequired(), Length(min=2, max=50)])
-    cantidad = IntegerField("Cantidad", validators=[DataRequired(), NumberRange(min=0)])
-    precio   = DecimalField("Precio", places=2, validators=[DataRequired(), NumberRange(min=0)])
-    enviar   = SubmitField("Guardar")
-
-class DeleteForm(FlaskForm):
-    enviar = SubmitField("Eliminar")
-
-class UsuarioMySQLForm(FlaskForm):
-    nombre = StringField("Nombre", validators=[DataRequired(), Length(min=2, max=100)])
-    email  = StringField("Email",  validators=[DataRequired(), Email(), Length(max=120)])
-    enviar = SubmitField("Agregar")
-
-class RegisterForm(FlaskForm):
-    nombre = StringField("Nombre", validators=[DataRequired(), Length(min=2, max=100)])
-    email  = StringField("Email", validators=[DataRequired(), Email(), Length(max=120)])
-    password = PasswordField("Contraseña", validators=[DataRequired(), Length(min=6, max=128)])
-    enviar = SubmitField("Crear cuenta")
-
-class LoginForm(FlaskForm):
-    email  = StringField("Email", validators=[DataRequired(), Email(), Length(max=120)])
-    password = PasswordField("Contraseña", validators=[DataRequired(), Length(min=6, max=128)])
-    enviar = SubmitField("Iniciar sesión")
-
-# Nueva: Categorías (MySQL)
-class CategoriaMySQLForm(FlaskForm):
-    nombre = StringField("Nombre", validators=[DataRequired(), Length(min=2, max=80)])
-    enviar = SubmitField("Guardar")
+# ---------------------- GET condicional (ETag) -------------------
+# ETag débil = hash(URL, usuario, versiones de las tablas que muestra la vista,
+# tramo de vigencia del token CSRF). Con If-None-Match coincidente se responde
+# 304 sin tocar la base de datos ni Jinja.
+def condicional(*tablas):
+    tablas = set(tablas) | {TODAS}
+    def deco(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            # Con mensajes flash pendientes la página cambia aunque los datos no
+            vista = app.ensure_sync(view)     # admite vistas async def
+            if request.method != "GET" or session.get("_flashes"):
+                return vista(*args, **kwargs)
+            vers = versiones.get(tablas)
+            tramo = int(time.time() // max(1, (app.config.get("WTF_CSRF_TIME_LIMIT") or 3600) // 2))
+            clave = repr((request.full_path, current_user.get_id(), session.get("csrf_token"),
+                          tramo, sorted((t, v[0]) for t, v in vers.items())))
+            etag = hashlib.sha1(clave.encode()).hexdigest()
+            if request.if_none_match.contains_weak(etag):
+                resp = Response(status=304)
+            else:
+                resp = make_response(vista(*args, **kwargs))
+            resp.set_etag(etag, weak=True)
+            modificado = max(v[1] for v in vers.values())
+            if modificado:
+                resp.last_modified = modificado
+            resp.headers["Cache-Control"] = "private, no-cache"
+            return resp
+        return wrapper
+    return deco
+
+SQLITE_PRODUCTOS = "sqlite:productos"
 
 # ---------------------- Rutas productos (SQLite) ----------------
 @app.route("/")
 @login_required
+@condicional(SQLITE_PRODUCTOS)
 def home():
+    # Página ordenable + totales de la fila materializada: coste O(página), no O(catálogo)
+    page, per_page = get_page_args(default_per_page=25, max_per_page=200)
+    sort = request.args.get("sort") if request.args.get("sort") in ORDEN_COLUMNAS else "id"
+    direction = "desc" if request.args.get("dir") == "desc" else "asc"
+    ensure_db()
     with get_conn() as conn:
-        filas = conn.execute("SELECT id,nombre,cantidad,precio FROM productos ORDER BY id").fetchall()
-    total_items = sum(p["cantidad"] for p in filas)
-    total_valor = sum(p["cantidad"] * p["precio"] for p in filas)
+        filas = conn.execute(
+            f"SELECT id,nombre,cantidad,precio FROM productos "
+            f"ORDER BY {ORDEN_COLUMNAS[sort]} {direction}, id {direction} LIMIT ? OFFSET ?",
+            (per_page, (page - 1) * per_page)
+        ).fetchall()
+        tot = leer_totales(conn)
+    ctx = paginate_context(tot["productos"], page, per_page, "home", sort=sort, dir=direction)
     return render_template("index.html",
-                           productos=filas, delete_form=DeleteForm(),
-                           total_items=total_items, total_valor=total_valor,
-                           titulo="Inventario")
+                           productos=filas, delete_form=formularios.DeleteForm(),
+                           total_items=tot["unidades"], total_valor=tot["valor"],
+                           sort=sort, dir=direction,
+                           titulo="Inventario", **ctx)
 
 @app.route("/nuevo/", methods=["GET","POST"])
 @login_required
 def nuevo():
-    form = ProductoForm()
+    form = formularios.ProductoForm()
     if form.validate_on_submit():
-        with get_conn() as conn:
-            conn.execute("INSERT INTO productos(nombre,cantidad,precio) VALUES (?,?,?)",
-                         (form.nombre.data.strip(),
-                          int(form.cantidad.data),
-                          float(form.precio.data)))
-            conn.commit()
+        try:
+            with get_conn() as conn:
+                conn.execute("INSERT INTO productos(nombre,cantidad,precio) VALUES (?,?,?)",
+                             (form.nombre.data.strip(),
+                              int(form.cantidad.data),
+                              float(form.precio.data)))
+                conn.commit()
+        except sqlite3.IntegrityError:
+            flash("Ya existe un producto con ese nombre.", "warning")
+            return render_template("product_form.html", form=form, titulo="Nuevo producto")
+        versiones.bump({SQLITE_PRODUCTOS})
         flash("Producto creado.", "success")
         return redirect(url_for("home"))
     return render_template("product_form.html", form=form, titulo="Nuevo producto")
@@ -288,17 +601,22 @@ def editar(pid: int):
     if row is None:
         flash("Producto no encontrado.", "warning")
         return redirect(url_for("home"))
-    form = ProductoForm()
+    form = formularios.ProductoForm()
     if request.method == "GET":
         form.nombre.data = row["nombre"]; form.cantidad.data = row["cantidad"]; form.precio.data = row["precio"]
     if form.validate_on_submit():
-        with get_conn() as conn:
-            conn.execute("UPDATE productos SET nombre=?,cantidad=?,precio=? WHERE id=?",
-                         (form.nombre.data.strip(),
-                          int(form.cantidad.data),
-                          float(form.precio.data),
-                          pid))
-            conn.commit()
+        try:
+            with get_conn() as conn:
+                conn.execute("UPDATE productos SET nombre=?,cantidad=?,precio=? WHERE id=?",
+                             (form.nombre.data.strip(),
+                              int(form.cantidad.data),
+                              float(form.precio.data),
+                              pid))
+                conn.commit()
+        except sqlite3.IntegrityError:
+            flash("Ya existe un producto con ese nombre.", "warning")
+            return render_template("product_form.html", form=form, titulo=f"Editar (ID {pid})")
+        versiones.bump({SQLITE_PRODUCTOS})
         flash("Producto actualizado.", "success")
         return redirect(url_for("home"))
     return render_template("product_form.html", form=form, titulo=f"Editar (ID {pid})")
@@ -306,11 +624,12 @@ def editar(pid: int):
 @app.route("/eliminar/<int:pid>/", methods=["POST"])
 @login_required
 def eliminar(pid: int):
-    form = DeleteForm()
+    form = formularios.DeleteForm()
     if form.validate_on_submit():
         with get_conn() as conn:
             conn.execute("DELETE FROM productos WHERE id=?", (pid,))
             conn.commit()
+        versiones.bump({SQLITE_PRODUCTOS})
         flash(f"Producto ID {pid} eliminado.", "info")
     else:
         flash("Solicitud inválida.", "warning")
@@ -320,128 +639,345 @@ def eliminar(pid: int):
 @login_required
 def buscar():
     q = (request.args.get("q") or "").strip().lower()
-    with get_conn() as conn:
-        filas = conn.execute("SELECT * FROM productos ORDER BY id").fetchall()
-    resultados = [p for p in filas if q in p["nombre"].lower()] if q else []
-    total_items = sum(p["cantidad"] for p in resultados)
-    total_valor = sum(p["cantidad"] * p["precio"] for p in resultados)
+    page, per_page = get_page_args(default_per_page=20)
+    ensure_db()
+    resultados, total, total_items, total_valor = [], 0, 0, 0.0
+    if q:
+        with get_conn() as conn:
+            resultados, total, total_items, total_valor = buscar_productos(
+                conn, q, per_page, (page - 1) * per_page)
+    ctx = paginate_context(total, page, per_page, "buscar", q=q)
     return render_template("index.html",
-                           productos=resultados, delete_form=DeleteForm(),
+                           productos=resultados, delete_form=formularios.DeleteForm(),
                            total_items=total_items, total_valor=total_valor,
-                           q=q, titulo="Inventario")
+                           q=q, titulo="Inventario", **ctx)
 
 # ---------------------- SQLAlchemy (demo usuarios.db) -----------
-from sqlalchemy import create_engine, Column, Integer, String
-from sqlalchemy.orm import declarative_base, sessionmaker
-
-DB_DIR = (BASE_DIR / "database"); DB_DIR.mkdir(exist_ok=True)
-ENGINE = create_engine(f"sqlite:///{DB_DIR/'usuarios.db'}", echo=False, future=True)
-Base = declarative_base()
-
-class Usuario(Base):
-    __tablename__ = "usuarios"
-    id     = Column(Integer, primary_key=True)
-    nombre = Column(String(80), nullable=False)
-    email  = Column(String(120), nullable=False)
-
-Base.metadata.create_all(ENGINE)
-Session = sessionmaker(bind=ENGINE, expire_on_commit=False)
+# SQLAlchemy se importa y el motor se crea en la primera petición que lo usa
+# (uno por proceso; tras un fork el worker crea el suyo). SQLA_URL lo cambia.
+# Altas: /usuarios/crear pasa por una cola con commit agrupado y
+# POST /usuarios/lote inserta muchas en una transacción; /usuarios/listar
+# pagina por id (?despues_de=&limite=) o, con ?todo=1, recorre toda la tabla.
+demo_sqla = Perezoso("demo_sqla")
+app.config.setdefault("SQLA_URL", None)     # None: sqlite:///database/usuarios.db
+app.config.setdefault("SQLA_POOL_SIZE", 5)
+app.config.setdefault("SQLA_ALTAS_MAX_LOTE", 500)
+app.config.setdefault("SQLA_ALTAS_MAX_DELAY", 0.0)   # seg. extra para juntar más altas por commit
+app.config.setdefault("USUARIOS_PAGINA", 500)
+app.config.setdefault("USUARIOS_PAGINA_MAX", 5000)
+DB_DIR = BASE_DIR / "database"
+
+def _crear_demo():
+    url = app.config["SQLA_URL"]
+    if not url:
+        DB_DIR.mkdir(exist_ok=True)
+        url = f"sqlite:///{DB_DIR/'usuarios.db'}"
+    return demo_sqla.crear(url, pool_size=app.config["SQLA_POOL_SIZE"])
+
+def _cerrar_demo(d):
+    _altas.reset()
+    d[0].dispose()
+
+_demo = Subsistema("sqlalchemy", _crear_demo, cerrar=_cerrar_demo)
+_altas = Subsistema("sqla_altas", lambda: demo_sqla.AltasAgrupadas(
+    demo_engine(), max_lote=app.config["SQLA_ALTAS_MAX_LOTE"], max_delay=app.config["SQLA_ALTAS_MAX_DELAY"],
+    on_commit=lambda n: versiones.bump({"sqla:usuarios"})), cerrar=lambda a: a.close())
+
+def demo_engine():
+    return _demo.get()[0]
+
+def Session():
+    """Sesión nueva de la demo (mismo uso que el antiguo sessionmaker global)."""
+    return _demo.get()[1]()
 
 @app.route("/usuarios/crear")
 @login_required
 def usuarios_crear():
     nombre = (request.args.get("nombre") or "Usuario Demo").strip()
     email  = (request.args.get("email") or "demo@mail.com").strip()
-    with Session() as s:
-        s.add(Usuario(nombre=nombre, email=email))
-        s.commit()
-    return {"ok": True, "mensaje": f"Usuario '{nombre}' creado"}
+    try:
+        uid = _altas.get().agregar(nombre, email)
+    except demo_sqla.AltaFallida as e:
+        return {"ok": False, "mensaje": f"No se pudo crear: {e}"}, 500
+    return {"ok": True, "id": uid, "mensaje": f"Usuario '{nombre}' creado"}
+
+@app.route("/usuarios/lote", methods=["POST"])
+@login_required
+def usuarios_lote():
+    """[{"nombre": ..., "email": ...}, ...] (o {"usuarios": [...]}): todos o ninguno."""
+    data = request.get_json(silent=True)
+    usuarios = data.get("usuarios") if isinstance(data, dict) else data
+    if not isinstance(usuarios, list):
+        return {"error": "se esperaba una lista de usuarios"}, 400
+    if len(usuarios) > app.config["LOTE_MAX"]:
+        return {"error": f"máximo {app.config['LOTE_MAX']} usuarios por lote"}, 413
+    filas, errores = [], []
+    for i, u in enumerate(usuarios):
+        nombre = u.get("nombre") if isinstance(u, dict) else None
+        email = u.get("email") if isinstance(u, dict) else None
+        if not isinstance(nombre, str) or not nombre.strip() or len(nombre) > 80 \
+                or not isinstance(email, str) or not email.strip() or len(email) > 120:
+            errores.append({"indice": i, "error": "nombre (≤80) y email (≤120) son obligatorios"})
+            continue
+        filas.append({"nombre": nombre.strip(), "email": email.strip()})
+    if errores:
+        return {"error": "lote descartado", "errores": errores}, 400
+    try:
+        ids = demo_sqla.insertar(demo_engine(), filas)
+    except Exception as e:
+        return {"error": f"lote descartado: {e}"}, 409
+    if ids:
+        versiones.bump({"sqla:usuarios"})
+    return {"ok": True, "insertados": len(ids), "ids": ids}
 
 @app.route("/usuarios/listar")
 @login_required
+@condicional("sqla:usuarios")
 def usuarios_listar():
-    with Session() as s:
-        users = s.query(Usuario).order_by(Usuario.id).all()
-    data = [{"id": u.id, "nombre": u.nombre, "email": u.email} for u in users]
-    return f"<pre>{json.dumps(data, ensure_ascii=False, indent=2)}</pre>"
+    campos = ("id", "nombre", "email")
+    if request.args.get("todo") == "1":
+        filas = demo_sqla.recorrer(demo_engine(), app.config["USUARIOS_PAGINA"])
+        return Response(_pre_json_array(dict(zip(campos, f)) for f in filas), mimetype="text/html")
+    despues_de = max(0, _as_int(request.args.get("despues_de"), 0))
+    limite = max(1, min(_as_int(request.args.get("limite"), app.config["USUARIOS_PAGINA"]),
+                        app.config["USUARIOS_PAGINA_MAX"]))
+    filas = demo_sqla.pagina(demo_engine(), despues_de, limite)
+    resp = Response(_pre_json_array(dict(zip(campos, f)) for f in filas), mimetype="text/html")
+    if len(filas) == limite:
+        resp.headers["X-Despues-De"] = str(filas[-1][0])     # cursor de la página siguiente
+    return resp
 
 # ---------------------- TEST MySQL ------------------------------
 @app.route("/test_db")
 def test_db():
-    conn = get_db_connection()
-    cur = conn.cursor()
-    cur.execute("SHOW TABLES")
-    tables = cur.fetchall()
-    cur.close(); conn.close()
+    with borrow_connection() as conn:
+        cur = conn.cursor()
+        cur.execute("SHOW TABLES")
+        tables = cur.fetchall()
+        cur.close()
     return f"OK MySQL → {tables}"
 
+@app.route("/mysql/pool")
+@login_required
+def mysql_pool_stats():
+    return {**pool_stats(), "query_cache": query_cache.stats()}
+
 # ---------------------- Helpers MySQL + Paginación --------------
-def mysql_fetch_all(sql, params=()):
-    conn = get_db_connection()
-    cur = conn.cursor(dictionary=True)
-    cur.execute(sql, params)
-    rows = cur.fetchall()
-    cur.close(); conn.close()
+# Caché de lecturas etiquetada por tabla: mysql_execute sube la versión de la
+# tabla escrita y las entradas que la leían dejan de valer. cache=False la salta.
+app.config.setdefault("QUERY_CACHE", True)
+query_cache = QueryCache(versiones, maxsize=512, ttl=60)
+
+def _cacheable(sql, cache):
+    return cache and app.config["QUERY_CACHE"] and sql.lstrip()[:6].upper() == "SELECT"
+
+def mysql_fetch_all(sql, params=(), cache=True):
+    if _cacheable(sql, cache):
+        return query_cache.fetch(("all", sql, tuple(params)), tablas_leidas(sql),
+                                 lambda: mysql_fetch_all(sql, params, cache=False))
+    with borrow_connection() as conn:
+        cur = conn.cursor(dictionary=True)
+        with metricas.cronometro("mysql", sql, params):
+            cur.execute(sql, params)
+            rows = cur.fetchall()
+        cur.close()
     return rows
 
 def mysql_execute(sql, params=()):
-    conn = get_db_connection()
-    cur = conn.cursor()
-    cur.execute(sql, params)
-    conn.commit()
-    cur.close(); conn.close()
-
-def mysql_scalar(sql, params=()):
-    conn = get_db_connection()
-    cur = conn.cursor()
-    cur.execute(sql, params)
-    val = cur.fetchone()[0]
-    cur.close(); conn.close()
+    with borrow_connection() as conn:
+        cur = conn.cursor()
+        with metricas.cronometro("mysql", sql, params):
+            cur.execute(sql, params)
+            conn.commit()
+        cur.close()
+    versiones.bump(tablas_escritas(sql))
+
+def mysql_scalar(sql, params=(), cache=True):
+    if _cacheable(sql, cache):
+        return query_cache.fetch(("scalar", sql, tuple(params)), tablas_leidas(sql),
+                                 lambda: mysql_scalar(sql, params, cache=False))
+    with borrow_connection() as conn:
+        cur = conn.cursor()
+        with metricas.cronometro("mysql", sql, params):
+            cur.execute(sql, params)
+            val = cur.fetchone()[0]
+        cur.close()
     return val
 
-def get_page_args(default_per_page=8):
+def mysql_fetch_page(sql, params, page, per_page):
+    """
+    Página + total en un solo viaje: `sql` (sin LIMIT) debe incluir
+    `COUNT(*) OVER() AS total_rows`. Devuelve (filas, total).
+    """
+    rows = mysql_fetch_all(f"{sql} LIMIT %s OFFSET %s", (*params, per_page, (page - 1) * per_page))
+    if rows:
+        total = rows[0]["total_rows"]
+    elif page > 1:
+        # Página fuera de rango: no hay fila de la que leer el total
+        total = mysql_scalar(f"SELECT COUNT(*) FROM ({sql}) AS t", tuple(params))
+    else:
+        total = 0
+    for r in rows:
+        r.pop("total_rows", None)
+    return rows, total
+
+def get_page_args(default_per_page=8, max_per_page=50):
     try: page = int(request.args.get("page", 1))
     except (TypeError, ValueError): page = 1
     try: per_page = int(request.args.get("per_page", default_per_page))
     except (TypeError, ValueError): per_page = default_per_page
     page = max(1, page)
-    per_page = max(1, min(per_page, 50))
+    per_page = max(1, min(per_page, max_per_page))
     return page, per_page
 
-def paginate_context(total_rows, page, per_page, endpoint, **kwargs):
+def paginate_context(total_rows, page, per_page, endpoint, next_cursor=None, prev_cursor=None, **kwargs):
     total_pages = max(1, ceil(total_rows / per_page)) if per_page else 1
-    prev_url = url_for(endpoint, page=page-1, per_page=per_page, **kwargs) if page > 1 else None
-    next_url = url_for(endpoint, page=page+1, per_page=per_page, **kwargs) if page < total_pages else None
+    if next_cursor or prev_cursor:
+        # Modo keyset: los enlaces llevan cursores opacos en vez de ?page=
+        prev_url = url_for(endpoint, cursor=prev_cursor, per_page=per_page, **kwargs) if prev_cursor else None
+        next_url = url_for(endpoint, cursor=next_cursor, per_page=per_page, **kwargs) if next_cursor else None
+        total_pages = max(total_pages, page)
+    else:
+        prev_url = url_for(endpoint, page=page-1, per_page=per_page, **kwargs) if page > 1 else None
+        next_url = url_for(endpoint, page=page+1, per_page=per_page, **kwargs) if page < total_pages else None
     return {
         "page": page, "per_page": per_page, "total_rows": total_rows,
         "total_pages": total_pages, "prev_url": prev_url, "next_url": next_url
     }
 
+# ---------------------- Paginación keyset (seek) ----------------
+# ?mode=keyset (o PAGINATION_MODE="keyset") pagina con WHERE clave > último visto
+# en vez de OFFSET, así la página 10.000 cuesta lo mismo que la 1.
+app.config.setdefault("PAGINATION_MODE", "offset")
+app.config.setdefault("KEYSET_TOTAL", "cached")   # "cached" (COUNT con TTL) | "approx" (information_schema)
+TOTAL_CACHE_TTL = 30
+_TOTAL_CACHE = {}
+
+def encode_cursor(key, direction, page):
+    raw = json.dumps({"k": key, "d": direction, "p": page}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(token):
+    """Devuelve (clave, dirección, página) o None si el cursor no es válido."""
+    try:
+        data = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+        key, direction, page = int(data["k"]), data["d"], max(1, int(data["p"]))
+    except (ValueError, TypeError, KeyError):
+        return None
+    return (key, direction, page) if direction in ("next", "prev") else None
+
+def use_keyset():
+    return bool(request.args.get("cursor")) or \
+        (request.args.get("mode") or app.config["PAGINATION_MODE"]) == "keyset"
+
+def mysql_table_total(table):
+    """Total aproximado o cacheado: evita COUNT(*) en cada página del modo keyset."""
+    if app.config["KEYSET_TOTAL"] == "approx":
+        return mysql_scalar(
+            "SELECT COALESCE(TABLE_ROWS, 0) FROM information_schema.TABLES "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s", (table,)
+        ) or 0
+    hit = _TOTAL_CACHE.get(table)
+    if hit and time.monotonic() - hit[0] < TOTAL_CACHE_TTL:
+        return hit[1]
+    total = mysql_scalar(f"SELECT COUNT(*) FROM {table}")
+    _TOTAL_CACHE[table] = (time.monotonic(), total)
+    return total
+
+def mysql_fetch_keyset(columns, table, key, per_page, cursor, desc=False):
+    """
+    Una página por búsqueda de clave (LIMIT per_page+1 para saber si hay más).
+    Devuelve (filas, página, next_cursor, prev_cursor).
+    """
+    key_val, direction, page = cursor if cursor else (None, "next", 1)
+    forward = direction == "next"
+    # Hacia atrás se recorre en orden inverso y luego se da la vuelta
+    asc = (not desc) if forward else desc
+    op, order = (">", "ASC") if asc else ("<", "DESC")
+    where, params = (f"WHERE {key} {op} %s", (key_val,)) if key_val is not None else ("", ())
+    rows = mysql_fetch_all(
+        f"SELECT {columns} FROM {table} {where} ORDER BY {key} {order} LIMIT %s",
+        (*params, per_page + 1)
+    )
+    more = len(rows) > per_page
+    rows = rows[:per_page]
+    if not forward:
+        rows.reverse()
+    if not rows:
+        return rows, page, None, None
+    has_next = more if forward else True
+    has_prev = (key_val is not None) if forward else more
+    next_c = encode_cursor(rows[-1][key], "next", page + 1) if has_next else None
+    prev_c = encode_cursor(rows[0][key], "prev", page - 1) if has_prev and page > 1 else None
+    return rows, page, next_c, prev_c
+
+def mysql_listing(table, columns, key, endpoint, desc=False, default_per_page=8):
+    """Listado paginado para las vistas MySQL: OFFSET (por defecto) o keyset."""
+    page, per_page = get_page_args(default_per_page=default_per_page)
+    if use_keyset():
+        cursor = decode_cursor(request.args.get("cursor") or "")
+        rows, page, next_c, prev_c = mysql_fetch_keyset(columns, table, key, per_page, cursor, desc)
+        ctx = paginate_context(mysql_table_total(table), page, per_page, endpoint,
+                               next_cursor=next_c, prev_cursor=prev_c)
+        return rows, ctx
+    order = "DESC" if desc else "ASC"
+    rows, total = mysql_fetch_page(
+        f"SELECT {columns}, COUNT(*) OVER() AS total_rows FROM {table} ORDER BY {key} {order}",
+        (), page, per_page
+    )
+    return rows, paginate_context(total, page, per_page, endpoint)
+
+# ---------------------- Helpers MySQL async ---------------------
+# Equivalentes awaitables para vistas async def: cada llamada usa su propia
+# conexión del pool en un hilo de asincrono.ejecutor(), así las consultas
+# independientes de una vista viajan a la vez (asyncio.gather). La conexión
+# de la petición (la del user_loader, p. ej.) se suelta antes de esperar.
+amysql_fetch_all = en_hilo(mysql_fetch_all)
+amysql_execute = en_hilo(mysql_execute)
+amysql_scalar = en_hilo(mysql_scalar)
+amysql_fetch_page = en_hilo(mysql_fetch_page)
+amysql_fetch_keyset = en_hilo(mysql_fetch_keyset)
+amysql_table_total = en_hilo(mysql_table_total)
+
+async def amysql_listing(table, columns, key, endpoint, desc=False, default_per_page=8):
+    """mysql_listing para vistas async: en modo keyset la página y el total se piden en paralelo."""
+    import asyncio      # diferido: sólo lo pagan las peticiones a vistas async
+    page, per_page = get_page_args(default_per_page=default_per_page)
+    if use_keyset():
+        cursor = decode_cursor(request.args.get("cursor") or "")
+        (rows, page, next_c, prev_c), total = await asyncio.gather(
+            amysql_fetch_keyset(columns, table, key, per_page, cursor, desc), amysql_table_total(table))
+        return rows, paginate_context(total, page, per_page, endpoint, next_cursor=next_c, prev_cursor=prev_c)
+    # OFFSET: página y total ya llegan juntos (COUNT(*) OVER()), no hay nada que paralelizar
+    order = "DESC" if desc else "ASC"
+    rows, total = await amysql_fetch_page(
+        f"SELECT {columns}, COUNT(*) OVER() AS total_rows FROM {table} ORDER BY {key} {order}",
+        (), page, per_page
+    )
+    return rows, paginate_context(total, page, per_page, endpoint)
+
 # ---------------------- Usuarios (MySQL) paginado ---------------
 @app.route("/mysql/usuarios", methods=["GET", "POST"])
 @login_required
-def mysql_usuarios():
-    form = UsuarioMySQLForm()
+@condicional("mysql:usuarios")
+async def mysql_usuarios():
+    form = formularios.UsuarioMySQLForm()
 
     if form.validate_on_submit():
-        try:
-            mysql_execute(
-                "INSERT INTO usuarios (nombre, email, password_hash) VALUES (%s, %s, %s)",
-                (form.nombre.data.strip(), form.email.data.strip(), "PLACEHOLDER")
-            )
-            flash("Usuario creado en MySQL.", "success")
-            return redirect(url_for("mysql_usuarios"))
-        except Exception as e:
-            flash(f"Error al crear usuario: {e}", "danger")
-
-    page, per_page = get_page_args(default_per_page=8)
-    total = mysql_scalar("SELECT COUNT(*) FROM usuarios")
-    offset = (page - 1) * per_page
-    usuarios = mysql_fetch_all(
-        "SELECT id, nombre, email FROM usuarios ORDER BY id LIMIT %s OFFSET %s",
-        (per_page, offset)
-    )
-    ctx = paginate_context(total, page, per_page, "mysql_usuarios")
+        if await aget_user_by_email(form.email.data.strip()):
+            flash("Ese email ya está registrado.", "warning")
+        else:
+            try:
+                await amysql_execute(
+                    "INSERT INTO usuarios (nombre, email, password_hash) VALUES (%s, %s, %s)",
+                    (form.nombre.data.strip(), form.email.data.strip(), "PLACEHOLDER")
+                )
+                flash("Usuario creado en MySQL.", "success")
+                return redirect(url_for("mysql_usuarios"))
+            except Exception as e:
+                flash(f"Error al crear usuario: {e}", "danger")
+
+    usuarios, ctx = await amysql_listing("usuarios", "id, nombre, email", "id", "mysql_usuarios")
     return render_template("mysql_usuarios.html", usuarios=usuarios, form=form, titulo="Usuarios (MySQL)", **ctx)
 
 @app.route("/mysql/usuarios/eliminar/<int:uid>", methods=["POST"])
@@ -449,36 +985,26 @@ def mysql_usuarios():
 def mysql_usuarios_eliminar(uid: int):
     try:
         mysql_execute("DELETE FROM usuarios WHERE id = %s", (uid,))
+        invalidar_usuario(uid)
         flash(f"Usuario {uid} eliminado.", "info")
     except Exception as e:
         flash(f"Error eliminando usuario: {e}", "danger")
     return redirect(url_for("mysql_usuarios"))
 
 # ---------------------- Productos (MySQL) paginado + CRUD -------
-class ProductoMySQLForm(FlaskForm):
-    nombre = StringField("Nombre", validators=[DataRequired(), Length(min=2, max=100)])
-    precio = DecimalField("Precio", places=2, validators=[DataRequired(), NumberRange(min=0)])
-    stock  = IntegerField("Stock", validators=[DataRequired(), NumberRange(min=0)])
-    enviar = SubmitField("Guardar")
-
 @app.route("/mysql/productos")
 @login_required
-def mysql_productos():
-    page, per_page = get_page_args(default_per_page=8)
-    total = mysql_scalar("SELECT COUNT(*) FROM productos")
-    offset = (page - 1) * per_page
+@condicional("mysql:productos")
+async def mysql_productos():
     # Orden DESC para que lo recién creado se vea arriba
-    productos = mysql_fetch_all(
-        "SELECT id_producto, nombre, precio, stock FROM productos ORDER BY id_producto DESC LIMIT %s OFFSET %s",
-        (per_page, offset)
-    )
-    ctx = paginate_context(total, page, per_page, "mysql_productos")
+    productos, ctx = await amysql_listing("productos", "id_producto, nombre, precio, stock", "id_producto",
+                                   "mysql_productos", desc=True)
     return render_template("mysql_productos.html", productos=productos, titulo="Productos (MySQL)", **ctx)
 
 @app.route("/mysql/productos/crear", methods=["GET","POST"])
 @login_required
 def mysql_productos_crear():
-    form = ProductoMySQLForm()
+    form = formularios.ProductoMySQLForm()
     if form.validate_on_submit():
         try:
             mysql_execute(
@@ -505,7 +1031,7 @@ def mysql_productos_editar(pid=None, id_producto=None):
         flash("Producto no encontrado.", "warning")
         return redirect(url_for("mysql_productos"))
 
-    form = ProductoMySQLForm()
+    form = formularios.ProductoMySQLForm()
     if request.method == "GET":
         form.nombre.data = row[0]["nombre"]
         form.precio.data = row[0]["precio"]
@@ -542,21 +1068,15 @@ def mysql_productos_eliminar(pid=None, id_producto=None):
 # ---------------------- Categorías (MySQL) paginado + CRUD ------
 @app.route("/mysql/categorias")
 @login_required
-def mysql_categorias():
-    page, per_page = get_page_args(default_per_page=8)
-    total = mysql_scalar("SELECT COUNT(*) FROM categorias")
-    offset = (page - 1) * per_page
-    categorias = mysql_fetch_all(
-        "SELECT id_categoria, nombre FROM categorias ORDER BY id_categoria LIMIT %s OFFSET %s",
-        (per_page, offset)
-    )
-    ctx = paginate_context(total, page, per_page, "mysql_categorias")
+@condicional("mysql:categorias")
+async def mysql_categorias():
+    categorias, ctx = await amysql_listing("categorias", "id_categoria, nombre", "id_categoria", "mysql_categorias")
     return render_template("mysql_categorias.html", categorias=categorias, titulo="Categorías (MySQL)", **ctx)
 
 @app.route("/mysql/categorias/crear", methods=["GET","POST"])
 @login_required
 def mysql_categorias_crear():
-    form = CategoriaMySQLForm()
+    form = formularios.CategoriaMySQLForm()
     if form.validate_on_submit():
         try:
             mysql_execute("INSERT INTO categorias (nombre) VALUES (%s)", (form.nombre.data.strip(),))
@@ -573,7 +1093,7 @@ def mysql_categorias_editar(cid: int):
     if not row:
         flash("Categoría no encontrada.", "warning")
         return redirect(url_for("mysql_categorias"))
-    form = CategoriaMySQLForm()
+    form = formularios.CategoriaMySQLForm()
     if request.method == "GET":
         form.nombre.data = row[0]["nombre"]
     if form.validate_on_submit():
@@ -596,14 +1116,143 @@ def mysql_categorias_eliminar(cid: int):
         flash(f"Error eliminando categoría: {e}", "danger")
     return redirect(url_for("mysql_categorias"))
 
+# ---------------------- Lotes JSON (MySQL) ---------------------
+# POST /mysql/<productos|categorias>/lote con
+#   {"crear": [{...}], "actualizar": [{"id_producto": 1, "precio": 9.5}], "eliminar": [3, 4]}
+# Todo en una transacción (ver lote_mysql); resultado por elemento y en orden.
+app.config.setdefault("LOTE_MAX", 50000)
+
+@app.route("/mysql/<tabla>/lote", methods=["POST"])
+@login_required
+def mysql_lote(tabla):
+    spec = TABLAS_LOTE.get(tabla)
+    if spec is None:
+        return {"error": f"tabla no soportada: {tabla}"}, 404
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return {"error": "se esperaba un objeto JSON con crear/actualizar/eliminar"}, 400
+    partes = {k: data.get(k) or [] for k in ("crear", "actualizar", "eliminar")}
+    if not all(isinstance(v, list) for v in partes.values()):
+        return {"error": "crear, actualizar y eliminar deben ser listas"}, 400
+    if sum(map(len, partes.values())) > app.config["LOTE_MAX"]:
+        return {"error": f"máximo {app.config['LOTE_MAX']} elementos por lote"}, 413
+    try:
+        with borrow_connection() as conn:
+            res = aplicar_lote(conn, spec, **partes)
+    except Exception as e:
+        return {"error": f"lote descartado: {e}"}, 409
+    if any(r["ok"] for r in res["resumen"].values()):
+        versiones.bump({f"mysql:{spec.tabla}"})
+    return res
+
+# ---------------------- Stock por deltas (MySQL) ----------------
+# POST /mysql/productos/stock con [{"id_producto": 1, "delta": -3, "motivo": "venta"}, ...]
+# (o {"movimientos": [...]}): stock = stock + delta sin pisar ediciones
+# concurrentes, nunca por debajo de 0, con rastro en movimientos_stock.
+_LIBRO_LISTO = False
+
+def _asegurar_libro():
+    global _LIBRO_LISTO
+    if not _LIBRO_LISTO:
+        with borrow_connection() as conn:
+            crear_libro(conn)
+        _LIBRO_LISTO = True
+
+@app.route("/mysql/productos/stock", methods=["POST"])
+@login_required
+def mysql_productos_stock():
+    data = request.get_json(silent=True)
+    movimientos = data.get("movimientos") if isinstance(data, dict) else data
+    if not isinstance(movimientos, list):
+        return {"error": "se esperaba una lista de movimientos"}, 400
+    if len(movimientos) > app.config["LOTE_MAX"]:
+        return {"error": f"máximo {app.config['LOTE_MAX']} movimientos por llamada"}, 413
+    try:
+        _asegurar_libro()
+        with borrow_connection() as conn:
+            res = aplicar_deltas(conn, movimientos, usuario_id=current_user.get_id())
+    except Exception as e:
+        return {"error": f"movimientos descartados: {e}"}, 409
+    if res["resumen"]["movimientos_ok"]:
+        versiones.bump({"mysql:productos", "mysql:movimientos_stock"})
+    return res
+
+@app.route("/mysql/productos/<int:pid>/movimientos")
+@login_required
+def mysql_productos_movimientos(pid: int):
+    _asegurar_libro()
+    page, per_page = get_page_args(default_per_page=50, max_per_page=500)
+    rows = mysql_fetch_all(
+        "SELECT id, delta, stock_resultante, motivo, usuario_id, creado FROM movimientos_stock "
+        "WHERE id_producto=%s ORDER BY id DESC LIMIT %s OFFSET %s", (pid, per_page, (page - 1) * per_page))
+    for r in rows:
+        r["creado"] = str(r["creado"])
+    return {"id_producto": pid, "page": page, "per_page": per_page, "movimientos": rows}
+
+# ---------------------- Exportación (CSV / NDJSON en streaming) ---
+# Volcado completo sin paginar para ETL: ?since_id=N (solo id > N, en orden de
+# id, para tirones incrementales), ?q=texto (filtro por nombre), ?gzip=1.
+# Las filas se leen por bloques y se escriben según llegan: memoria constante.
+EXPORT_MYSQL = {
+    "productos":  ("id_producto, nombre, precio, stock", "id_producto"),
+    "categorias": ("id_categoria, nombre", "id_categoria"),
+}
+
+def _export_args():
+    try: since_id = int(request.args.get("since_id", 0))
+    except (TypeError, ValueError): since_id = 0
+    q = (request.args.get("q") or "").strip()
+    like = "%" + q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%" if q else None
+    return since_id, like, request.args.get("gzip") in ("1", "true", "si")
+
+def _export_response(nombre, formato, filas, comprimir):
+    resp = Response(export_stream(formato, filas, comprimir), mimetype=FORMATOS[formato])
+    resp.headers["Content-Disposition"] = f'attachment; filename="{nombre}.{formato}"'
+    resp.headers["Cache-Control"] = "private, no-store"
+    if comprimir:
+        resp.headers["Content-Encoding"] = "gzip"
+        resp.headers["Vary"] = "Accept-Encoding"
+    return resp
+
+@app.route("/export/productos.<formato>")
+@login_required
+def export_productos(formato):
+    if formato not in FORMATOS:
+        return {"error": f"formato no soportado: {formato}"}, 404
+    ensure_db()
+    since_id, like, comprimir = _export_args()
+    sql = "SELECT id, nombre, cantidad, precio FROM productos WHERE id > ?"
+    params = [since_id]
+    if like:
+        sql += " AND nombre LIKE ? ESCAPE '\\'"
+        params.append(like)
+    filas = filas_sqlite(get_conn(), sql + " ORDER BY id", params)
+    return _export_response("productos", formato, filas, comprimir)
+
+@app.route("/mysql/export/<tabla>.<formato>")
+@login_required
+def mysql_export(tabla, formato):
+    if tabla not in EXPORT_MYSQL or formato not in FORMATOS:
+        return {"error": f"exportación no soportada: {tabla}.{formato}"}, 404
+    columnas, clave = EXPORT_MYSQL[tabla]
+    since_id, like, comprimir = _export_args()
+    sql = f"SELECT {columnas} FROM {tabla} WHERE {clave} > %s"
+    params = [since_id]
+    if like:
+        sql += " AND nombre LIKE %s"
+        params.append(like)
+    # Conexión propia del pool (no la de la petición: el generador corre tras el teardown)
+    filas = filas_mysql(get_db_connection, f"{sql} ORDER BY {clave}", params)
+    return _export_response(tabla, formato, filas, comprimir)
+
 # ---------------------- AUTH (Flask-Login + MySQL) --------------
 @app.route("/auth/register", methods=["GET", "POST"])
-def auth_register():
+async def auth_register():
     if current_user.is_authenticated:
         return redirect(url_for("panel"))
-    form = RegisterForm()
+    form = formularios.RegisterForm()
     if form.validate_on_submit():
-        if get_user_by_email(form.email.data.strip()):
+        if await aget_user_by_email(form.email.data.strip()):
             flash("Ese email ya está registrado.", "warning")
         else:
             create_user(form.nombre.data.strip(), form.email.data.strip(), form.password.data)
@@ -611,16 +1260,27 @@ def auth_register():
             return redirect(url_for("auth_login"))
     return render_template("auth_register.html", form=form, titulo="Crear cuenta")
 
+def _rehash_si_hace_falta(row, password):
+    """Tras un login correcto, rehace el hash si se hizo con otros parámetros (opcional: si el pool está lleno, otra vez será)."""
+    try:
+        if hash_claves.necesita_rehash(row["password_hash"]):
+            update_password_hash(row["id"], hash_claves.generar(password))
+            hash_claves.rehash_hecho()
+    except Saturado:
+        pass
+
 @app.route("/auth/login", methods=["GET", "POST"])
-def auth_login():
+async def auth_login():
     if current_user.is_authenticated:
         return redirect(url_for("panel"))
-    form = LoginForm()
+    form = formularios.LoginForm()
     if form.validate_on_submit():
-        row = get_user_by_email(form.email.data.strip())
-        if not row or not row.get("password_hash") or not check_password_hash(row["password_hash"], form.password.data):
+        # El hash posterior espera al pool de procesos de hash_claves (acotado por PASSWORD_HASH_TIMEOUT)
+        row = await aget_user_by_email(form.email.data.strip())
+        if not row or not row.get("password_hash") or not hash_claves.verificar(row["password_hash"], form.password.data):
             flash("Credenciales inválidas.", "danger")
         else:
+            _rehash_si_hace_falta(row, form.password.data)
             user = User(row["id"], row["nombre"], row["email"])
             login_user(user, remember=True)
             flash(f"Bienvenido, {user.nombre}.", "success")
@@ -628,6 +1288,12 @@ def auth_login():
             return redirect(next_url)
     return render_template("auth_login.html", form=form, titulo="Iniciar sesión")
 
+@app.errorhandler(Saturado)
+def hash_saturado(e):
+    # Pool de hash lleno: rechazo rápido en vez de encolar logins sin límite
+    return Response("Demasiados inicios de sesión simultáneos; reintenta en unos segundos.",
+                    status=503, headers={"Retry-After": "2"}, mimetype="text/plain")
+
 @app.route("/auth/logout")
 @login_required
 def auth_logout():
@@ -641,7 +1307,103 @@ def auth_logout():
 def panel():
     return render_template("panel.html", titulo="Panel")
 
-# ---------------------- Punto de entrada ------------------------
+# ---------------------- CLI: almacén JSON Lines ------------------
+@app.cli.command("json-migrar")
+def json_migrar_cmd():
+    """Migra datos/datos.json (array) a datos/datos.jsonl si aún no existe."""
+    if JSONL_PATH.exists():
+        print(f"{JSONL_PATH.name} ya existe; nada que migrar.")
+    elif not JSON_PATH.exists():
+        print(f"{JSON_PATH.name} no existe.")
+    else:
+        print(f"Migrados {_migrar_json()} registros.")
+
+@app.cli.command("json-compactar")
+def json_compactar_cmd():
+    """Compacta datos.jsonl (sin líneas corruptas) y ajusta el checkpoint de importación."""
+    if not JSONL_PATH.exists():
+        print(f"{JSONL_PATH.name} no existe."); return
+    ensure_db()
+    archivo = str(JSONL_PATH.resolve())
+    with get_conn() as conn:
+        row = conn.execute("SELECT pos FROM import_checkpoints WHERE archivo=?", (archivo,)).fetchone()
+        stats = almacen_jsonl.compactar(JSONL_PATH, [row["pos"]] if row else [])
+        if row:
+            # El archivo nuevo tiene otro inode: se guarda su identidad con el offset traducido
+            st = JSONL_PATH.stat()
+            conn.execute("UPDATE import_checkpoints SET inode=?, size=?, mtime_ns=?, pos=? WHERE archivo=?",
+                         (st.st_ino, st.st_size, st.st_mtime_ns, stats["marcas"][row["pos"]], archivo))
+            conn.commit()
+    print(f"Conservadas={stats['conservadas']}, descartadas={stats['descartadas']}")
+
+# ---------------------- Sincronización SQLite <-> MySQL --------
+# Solo se mueve lo que cambió desde la última pasada (ver sincronizar.py).
+# `flask sync-productos` la ejecuta; /sync/productos muestra cursores,
+# cambios pendientes y métricas de la última pasada.
+app.config.setdefault("SYNC_LOTE", 500)
+app.config.setdefault("SYNC_GANADOR", "reciente")    # "reciente" | "mysql" | "sqlite"
+
+def _sincronizador(lote=None, ganador=None):
+    ensure_db()
+    return SincronizadorProductos(get_conn, get_db_connection,
+                                  lote=lote or app.config["SYNC_LOTE"],
+                                  ganador=ganador or app.config["SYNC_GANADOR"])
+
+@app.route("/sync/productos")
+@login_required
+def sync_estado():
+    sync = _sincronizador()
+    if get_conn().execute("SELECT 1 FROM sqlite_master WHERE name='sync_estado'").fetchone() is None:
+        return {"instalado": False}     # aún no se ejecutó `flask sync-productos`
+    return {"instalado": True, **sync.estado()}
+
+@app.cli.command("sync-productos")
+@click.option("--completo", is_flag=True, help="Reconciliar todo el catálogo además de los cambios registrados.")
+@click.option("--lote", type=int, default=None, help="Cambios leídos por lote y lado.")
+@click.option("--ganador", type=click.Choice(GANADORES), default=None, help="Regla para conflictos.")
+def sync_productos_cmd(completo, lote, ganador):
+    """Sincroniza productos entre inventario.db y MySQL (solo deltas)."""
+    sync = _sincronizador(lote, ganador)
+    if sync.instalar() and not completo:
+        print("Primera sincronización: se hace una pasada completa.")
+        completo = True
+    def progreso(st):
+        print(f"lote {st['lotes']}: nombres={st['nombres']} -> mysql={st['a_mysql']} "
+              f"-> sqlite={st['a_sqlite']} conflictos={st['conflictos']}")
+    stats = sync.sincronizar(completo=completo, progreso=progreso)
+    if stats["a_mysql"] or stats["a_sqlite"]:
+        versiones.bump({SQLITE_PRODUCTOS, "mysql:productos"})
+    print(f"Listo en {stats['segundos']}s: {stats['nombres']} nombres revisados, "
+          f"{stats['a_mysql']} escritos en MySQL, {stats['a_sqlite']} en SQLite, {stats['conflictos']} conflictos.")
+
+# ---------------------- Fábrica / arranque ----------------------
+# Importar este módulo solo registra rutas: nada de conexiones, archivos ni
+# imports pesados (ver subsistemas.py). create_app() aplica configuración
+# sobre el `app` del módulo y lo devuelve; gunicorn: "app:create_app()".
+# Claves propias además de las de Flask: DB_PATH, DATOS_DIR, SQLA_URL, TABLE_VERSIONS_FILE.
+def create_app(config=None):
+    global DB_PATH, DATOS_DIR, TXT_PATH, JSON_PATH, JSONL_PATH, CSV_PATH, _DB_READY
+    config = dict(config or {})
+    if "DB_PATH" in config:
+        DB_PATH, _DB_READY = str(config.pop("DB_PATH")), False
+    if "DATOS_DIR" in config:
+        DATOS_DIR = Path(config.pop("DATOS_DIR"))
+        TXT_PATH, JSON_PATH, JSONL_PATH, CSV_PATH = (DATOS_DIR / f"datos.{ext}" for ext in ("txt", "json", "jsonl", "csv"))
+        _FUENTES.update(txt=(TXT_PATH, _txt_registros), json=(JSON_PATH, _json_registros),
+                        jsonl=(JSONL_PATH, _jsonl_registros), csv=(CSV_PATH, _csv_registros))
+    if "TABLE_VERSIONS_FILE" in config:
+        versiones.usar(config.pop("TABLE_VERSIONS_FILE"))
+    if "SQLA_URL" in config and config["SQLA_URL"] != app.config["SQLA_URL"]:
+        _demo.reset()
+    app.config.update(config)
+    return app
+
+@app.route("/arranque")
+@login_required
+def arranque_estado():
+    """Subsistemas iniciados en este worker y coste de los imports diferidos."""
+    return estado_subsistemas()
+
 if __name__ == "__main__":
     init_db()
-    app.run(debug=True)
+    create_app().run(debug=True)
@@ -0,0 +1,56 @@
+# asincrono.py
+# Acceso a datos desde vistas async de Flask (async def, requiere asgiref:
+# Flask[async]). mysql.connector es bloqueante, así que cada llamada corre en
+# un pool de hilos propio del proceso y la corrutina solo espera: dentro de
+# una vista, las consultas independientes (p. ej. la página y el COUNT) se
+# lanzan a la vez con asyncio.gather.
+#
+# Las funciones se ejecutan SIN el contexto de Flask: borrow_connection() no
+# ve la conexión de la petición y presta una propia del pool, así dos
+# consultas simultáneas nunca comparten conexión. Antes de esperar, la
+# conexión que la petición tuviera en `g` (p. ej. la del user_loader) se
+# devuelve al pool: retenerla mientras se esperan otras puede agotar el pool
+# y dejar a todas las peticiones esperando conexiones que nadie suelta.
+# asyncio y concurrent.futures se importan en el primer uso, no al importar
+# app (ver subsistemas.py)
+import functools
+import os
+import threading
+from typing import Any, Awaitable, Callable, TypeVar
+
+from flask import has_app_context
+
+from Conexion.conexion import POOL_SIZE, release_request_connection
+
+# Más hilos que conexiones del pool solo añadirían esperas dentro del pool
+HILOS = int(os.environ.get("MYSQL_ASYNC_HILOS", POOL_SIZE))
+
+T = TypeVar("T")
+
+_ejecutor = None
+_ejecutor_pid = None
+_lock = threading.Lock()
+
+
+def ejecutor():
+    """Pool de hilos del proceso (se recrea tras un fork: los hilos no se heredan)."""
+    global _ejecutor, _ejecutor_pid
+    if _ejecutor_pid != os.getpid():
+        with _lock:
+            if _ejecutor_pid != os.getpid():
+                from concurrent.futures import ThreadPoolExecutor
+                _ejecutor = ThreadPoolExecutor(HILOS, thread_name_prefix="bd-async")
+                _ejecutor_pid = os.getpid()
+    return _ejecutor
+
+
+def en_hilo(fn: Callable[..., T]) -> Callable[..., Awaitable[T]]:
+    """Versión awaitable de una función bloqueante: misma firma, corre en ejecutor()."""
+    @functools.wraps(fn)
+    async def envoltura(*args, **kwargs) -> Any:
+        import asyncio
+        if has_app_context():
+            release_request_connection()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(ejecutor(), functools.partial(fn, *args, **kwargs))
+    return envoltura
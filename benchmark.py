@@ -0,0 +1,442 @@
+# ==============================================================
+# benchmark.py — Banco de pruebas de las rutas calientes
+#
+# Siembra catálogos sintéticos (1k / 100k / 1M filas) en un inventario.db
+# propio y en un sustituto de MySQL, recorre las vistas con el test client
+# de Flask y reporta rendimiento (peticiones/s), latencia p50/p99 y memoria
+# pico por escenario en JSON. Con --baseline compara contra una ejecución
+# guardada y termina con código 1 si algo empeoró más de la tolerancia.
+#
+#   python benchmark.py                                   # 1k, MySQL falso
+#   python benchmark.py --tamanos 1k,100k,1m --salida bench.json
+#   python benchmark.py --guardar-baseline bench_baseline.json
+#   python benchmark.py --baseline bench_baseline.json --tolerancia 0.25
+#   python benchmark.py --solo ninguno --import-max-ms 400   # solo el arranque
+#
+# También mide el coste de `import app` en un proceso nuevo (mediana de
+# --import-repeticiones) y qué dependencias pesadas quedaron cargadas; con
+# --import-max-ms pasar del presupuesto cuenta como regresión.
+#
+# Los datos se escriben en un directorio de trabajo temporal (--dir para
+# fijarlo): el inventario.db y datos/ del proyecto no se tocan.
+# --mysql real usa la base configurada en Conexion (solo lectura, sin sembrar).
+# ==============================================================
+import argparse
+import json
+import os
+import platform
+import random
+import re
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+TAMANOS = {"1k": 1_000, "10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+# Deben cargarse al usarse, no al importar app (ver subsistemas.py)
+PESADOS = ("sqlalchemy", "mysql.connector", "wtforms", "flask_wtf")
+PALABRAS = ("teclado mouse monitor cable router laptop tablet cargador parlante camara "
+            "disco memoria impresora escaner audifonos microfono silla escritorio lampara bateria").split()
+
+
+# ---------------------- Sustituto de MySQL ----------------------
+class MySQLFalso:
+    """
+    mysql.connector sobre un archivo SQLite con las tablas del proyecto
+    (usuarios, productos, categorias). Suficiente para las vistas paginadas y
+    los lotes de productos (ver _traducir); se enchufa reemplazando
+    mysql.connector.connect.
+    """
+
+    def __init__(self, path: Path):
+        self.path = str(path)
+
+    def instalar(self):
+        import mysql.connector
+        mysql.connector.connect = lambda **kw: _ConexionFalsa(self.path)
+
+    def sembrar(self, n_productos: int, n_categorias: int, n_usuarios: int):
+        rnd = random.Random(1)
+        with sqlite3.connect(self.path) as c:
+            c.executescript("""
+            DROP TABLE IF EXISTS usuarios; DROP TABLE IF EXISTS productos; DROP TABLE IF EXISTS categorias;
+            CREATE TABLE usuarios(id INTEGER PRIMARY KEY AUTOINCREMENT, nombre TEXT NOT NULL,
+                                  email TEXT NOT NULL UNIQUE, password_hash TEXT NOT NULL);
+            CREATE TABLE productos(id_producto INTEGER PRIMARY KEY AUTOINCREMENT, nombre TEXT NOT NULL,
+                                   precio REAL NOT NULL, stock INTEGER NOT NULL);
+            CREATE TABLE categorias(id_categoria INTEGER PRIMARY KEY AUTOINCREMENT, nombre TEXT NOT NULL);
+            """)
+            c.executemany("INSERT INTO productos(nombre, precio, stock) VALUES (?,?,?)",
+                          ((_nombre(rnd, i), round(rnd.uniform(1, 500), 2), rnd.randint(0, 1000))
+                           for i in range(n_productos)))
+            c.executemany("INSERT INTO categorias(nombre) VALUES (?)",
+                          ((f"Categoría {i}",) for i in range(n_categorias)))
+            c.executemany("INSERT INTO usuarios(nombre, email, password_hash) VALUES (?,?,?)",
+                          ((f"Usuario {i}", f"u{i}@bench.local", "") for i in range(n_usuarios)))
+
+
+# Lo justo del dialecto MySQL que usan las rutas medidas, reescrito para SQLite
+_VARIABLES = {"auto_increment_increment": "1", "innodb_autoinc_lock_mode": "1"}
+_REESCRITURAS = [
+    (re.compile(r"\bBIGINT NOT NULL AUTO_INCREMENT PRIMARY KEY"), "INTEGER PRIMARY KEY AUTOINCREMENT"),
+    (re.compile(r",\s*KEY \w+ \([^)]*\)"), ""),
+    (re.compile(r"\)\s*ENGINE=\w+[^)]*$"), ")"),
+    (re.compile(r"@@(\w+)"), lambda m: _VARIABLES[m.group(1)]),
+    (re.compile(r" FOR UPDATE$"), ""),
+]
+_UPSERT = re.compile(r"^INSERT INTO \w+ \((\w+),.* ON DUPLICATE KEY UPDATE ", re.S)
+
+
+def _traducir(sql: str) -> str:
+    sql = sql.strip().replace("%s", "?")
+    for patron, reemplazo in _REESCRITURAS:
+        sql = patron.sub(reemplazo, sql)
+    m = _UPSERT.match(sql)
+    if m:   # la clave va primera en las columnas (lote_mysql)
+        sql = sql.replace(" ON DUPLICATE KEY UPDATE ", f" ON CONFLICT({m.group(1)}) DO UPDATE SET ", 1)
+        sql = re.sub(r"VALUES\((\w+)\)", r"excluded.\1", sql)
+    return sql
+
+
+class _CursorFalso:
+    def __init__(self, conn, dictionary):
+        self._c = conn.cursor()
+        self._dict = dictionary
+        self.rowcount = -1
+        self.lastrowid = None
+        self.column_names = ()
+
+    def execute(self, sql, params=()):
+        sql = _traducir(sql)
+        self._c.execute(sql, tuple(params))
+        self.rowcount, self.lastrowid = self._c.rowcount, self._c.lastrowid
+        if sql.startswith("INSERT") and " ON CONFLICT" not in sql and self.rowcount > 1:
+            self.lastrowid -= self.rowcount - 1     # MySQL da la clave de la primera fila
+        self.column_names = tuple(d[0] for d in self._c.description or ())
+
+    def executemany(self, sql, seq):
+        self._c.executemany(_traducir(sql), [tuple(p) for p in seq])
+        self.rowcount = self._c.rowcount
+
+    def _fila(self, r):
+        return None if r is None else dict(zip(self.column_names, r)) if self._dict else r
+
+    def fetchone(self):
+        return self._fila(self._c.fetchone())
+
+    def fetchall(self):
+        return [self._fila(r) for r in self._c.fetchall()]
+
+    def fetchmany(self, n=1):
+        return [self._fila(r) for r in self._c.fetchmany(n)]
+
+    def close(self):
+        self._c.close()
+
+
+class _ConexionFalsa:
+    def __init__(self, path):
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+
+    @property
+    def in_transaction(self):
+        return self._conn.in_transaction
+
+    def cursor(self, dictionary=False, **kw):
+        return _CursorFalso(self._conn, dictionary)
+
+    def commit(self):
+        self._conn.commit()
+
+    def rollback(self):
+        self._conn.rollback()
+
+    def ping(self, **kw):
+        pass
+
+    def is_connected(self):
+        return True
+
+    def disconnect(self):
+        pass
+
+    def close(self):
+        self._conn.close()
+
+
+# ---------------------- Siembra --------------------------------
+def _nombre(rnd, i):
+    return f"{rnd.choice(PALABRAS).capitalize()} {rnd.choice(PALABRAS)} {i:07d}"
+
+
+def sembrar_sqlite(A, n: int):
+    """Catálogo de n productos en el inventario.db de trabajo (FTS y totales se reconstruyen en init_db)."""
+    rnd = random.Random(2)
+    A.sqlite_db.cerrar_todas()
+    for sufijo in ("", "-wal", "-shm"):
+        Path(A.DB_PATH + sufijo).unlink(missing_ok=True)
+    with sqlite3.connect(A.DB_PATH) as c:
+        c.execute("""CREATE TABLE productos(
+            id INTEGER PRIMARY KEY AUTOINCREMENT, nombre TEXT NOT NULL,
+            cantidad INTEGER NOT NULL CHECK(cantidad>=0), precio REAL NOT NULL CHECK(precio>=0))""")
+        c.executemany("INSERT INTO productos(nombre, cantidad, precio) VALUES (?,?,?)",
+                      ((_nombre(rnd, i), rnd.randint(0, 1000), round(rnd.uniform(1, 500), 2)) for i in range(n)))
+    A.init_db()
+
+
+def sembrar_archivos(A, n: int):
+    """Fuentes de import_all y de los visores: n registros por formato."""
+    rnd = random.Random(3)
+    filas = [(f"2025-01-01T00:00:{i % 60:02d}", _nombre(rnd, i), rnd.randint(1, 50), round(rnd.uniform(1, 500), 2))
+             for i in range(n)]
+    with open(A.TXT_PATH, "w", encoding="utf-8") as f:
+        f.writelines(f"{fe} | {no} | {ca} | {pr:.2f}\n" for fe, no, ca, pr in filas)
+    with open(A.CSV_PATH, "w", encoding="utf-8", newline="") as f:
+        f.write(",".join(A.CSV_FIELDS) + "\r\n")
+        f.writelines(f'{fe},"{no}",{ca},{pr}\r\n' for fe, no, ca, pr in filas)
+    with open(A.JSONL_PATH, "w", encoding="utf-8") as f:
+        f.writelines(json.dumps({"fecha": fe, "nombre": no, "cantidad": ca, "precio": pr}, ensure_ascii=False) + "\n"
+                     for fe, no, ca, pr in filas)
+
+
+def sembrar_sqla(A, n: int):
+    engine = A.demo_engine()
+    with engine.begin() as c:
+        c.execute(A.demo_sqla.Usuario.__table__.delete())
+    A.demo_sqla.insertar(engine, [{"nombre": f"Demo {i}", "email": f"d{i}@bench.local"} for i in range(n)])
+
+
+# ---------------------- App aislada ----------------------------
+def preparar_app(trabajo: Path, mysql: str):
+    """Importa app con todas sus rutas de datos dentro de `trabajo`."""
+    os.environ["TABLE_VERSIONS_FILE"] = str(trabajo / "versiones.db")
+    falso = None
+    if mysql == "falso":
+        falso = MySQLFalso(trabajo / "mysql.db")
+        falso.instalar()
+    sys.path.insert(0, str(Path(__file__).parent))
+    import app as A
+
+    A.create_app({"DB_PATH": trabajo / "inventario.db", "DATOS_DIR": trabajo,
+                  "SQLA_URL": f"sqlite:///{trabajo / 'usuarios.db'}",
+                  "LOGIN_DISABLED": True, "WTF_CSRF_ENABLED": False, "TESTING": True, "SLOW_QUERY_MS": None})
+    return A, falso
+
+
+# ---------------------- Arranque -------------------------------
+_SONDA_IMPORT = """
+import json, sys, time
+t0 = time.perf_counter()
+import app
+ms = (time.perf_counter() - t0) * 1000
+print(json.dumps({"ms": ms, "pesados": [m for m in %r if m in sys.modules]}))
+"""
+
+
+def medir_import(repeticiones: int, trabajo: Path):
+    """`import app` en procesos nuevos: mediana y máximo en ms, y dependencias pesadas cargadas."""
+    env = dict(os.environ, TABLE_VERSIONS_FILE=str(trabajo / "versiones_import.db"))
+    tiempos, pesados = [], set()
+    for _ in range(repeticiones):
+        r = subprocess.run([sys.executable, "-c", _SONDA_IMPORT % (PESADOS,)], cwd=Path(__file__).parent,
+                           env=env, capture_output=True, text=True, check=True)
+        d = json.loads(r.stdout.strip().splitlines()[-1])
+        tiempos.append(d["ms"])
+        pesados.update(d["pesados"])
+    return {"mediana_ms": round(statistics.median(tiempos), 1), "max_ms": round(max(tiempos), 1),
+            "pesados": sorted(pesados)}
+
+
+# ---------------------- Medición -------------------------------
+def percentil(ordenados, p):
+    if not ordenados:
+        return 0.0
+    return ordenados[min(len(ordenados) - 1, max(0, int(round(p / 100 * len(ordenados))) - 1))]
+
+
+def escenarios(n: int, n_archivo: int):
+    rnd = random.Random(4)
+    pag = lambda per_page, maximo=200: lambda: rnd.randint(1, max(1, min(maximo, n // per_page)))
+    p_home, p_mysql, p_csv = pag(25), pag(8), (lambda: rnd.randint(1, max(1, n_archivo // 100)))
+    pid = lambda: rnd.randint(1, n)
+    lote = lambda: {"crear": [{"nombre": f"Bench {rnd.randint(1, 10**6)}", "precio": 9.5, "stock": 10}
+                              for _ in range(20)],
+                    "actualizar": [{"id_producto": pid(), "precio": round(rnd.uniform(1, 500), 2)}
+                                   for _ in range(20)]}
+    stock = lambda: [{"id_producto": pid(), "delta": rnd.choice((-2, -1, 1, 3)), "motivo": "bench"}
+                     for _ in range(20)]
+    return [
+        # nombre, URL (función: str para GET, (url, json) para POST), repeticiones relativas
+        ("home",               lambda: f"/?page={p_home()}", 1.0),
+        ("home_orden_subtotal", lambda: f"/?sort=subtotal&dir=desc&page={p_home()}", 1.0),
+        ("buscar",             lambda: f"/buscar?q={rnd.choice(PALABRAS)[:4]}", 1.0),
+        ("import_all",         lambda: "/import/all?reiniciar=1", 0.05),
+        ("guardar_json",       lambda: f"/json/guardar?nombre=Bench+{rnd.randint(1, 10**6)}&cantidad=2", 1.0),
+        ("ver_csv",            lambda: f"/csv/ver?page={p_csv()}", 1.0),
+        ("usuarios_listar",    lambda: "/usuarios/listar", 1.0),
+        ("usuarios_listar_todo", lambda: "/usuarios/listar?todo=1", 0.2),
+        ("mysql_productos",    lambda: f"/mysql/productos?page={p_mysql()}", 1.0),
+        ("mysql_productos_keyset", lambda: "/mysql/productos?mode=keyset", 1.0),
+        ("mysql_categorias",   lambda: f"/mysql/categorias?page={rnd.randint(1, 20)}", 1.0),
+        ("mysql_usuarios",     lambda: f"/mysql/usuarios?page={rnd.randint(1, 20)}", 1.0),
+        ("mysql_productos_lote",  lambda: ("/mysql/productos/lote", lote()), 0.2),
+        ("mysql_productos_stock", lambda: ("/mysql/productos/stock", stock()), 0.2),
+    ]
+
+
+# Escriben en MySQL: con --mysql real (solo lectura) se omiten
+ESCRITURAS_MYSQL = {"mysql_productos_lote", "mysql_productos_stock"}
+
+
+def _pedir(cliente, u):
+    if isinstance(u, tuple):
+        return cliente.post(u[0], json=u[1])
+    return cliente.get(u)
+
+
+def medir(cliente, url, repeticiones: int, muestras_memoria: int):
+    for _ in range(min(3, repeticiones)):
+        _pedir(cliente, url())
+    tiempos = []
+    t_total = time.perf_counter()
+    for _ in range(repeticiones):
+        u = url()
+        t0 = time.perf_counter()
+        r = _pedir(cliente, u)
+        b = r.get_data()          # consumir también las respuestas en streaming
+        tiempos.append(time.perf_counter() - t0)
+        if r.status_code >= 400:
+            raise RuntimeError(f"{u[0] if isinstance(u, tuple) else u} → {r.status_code}: {b[:200]!r}")
+    t_total = time.perf_counter() - t_total
+
+    tracemalloc.start()
+    pico = 0
+    for _ in range(muestras_memoria):
+        tracemalloc.reset_peak()
+        _pedir(cliente, url()).get_data()
+        pico = max(pico, tracemalloc.get_traced_memory()[1])
+    tracemalloc.stop()
+
+    tiempos.sort()
+    return {"n": repeticiones, "rps": round(repeticiones / t_total, 1),
+            "p50_ms": round(percentil(tiempos, 50) * 1000, 3), "p99_ms": round(percentil(tiempos, 99) * 1000, 3),
+            "mem_pico_kb": round(pico / 1024, 1)}
+
+
+def comparar(actual, base, tolerancia):
+    """Lista de regresiones: latencias por encima de base·(1+tol) o rendimiento por debajo de base/(1+tol)."""
+    regresiones = []
+    for tam, escen in actual.items():
+        for nombre, m in escen.items():
+            b = base.get(tam, {}).get(nombre)
+            if not b:
+                continue
+            for k in ("p50_ms", "p99_ms", "mem_pico_kb"):
+                if b.get(k) and m[k] > b[k] * (1 + tolerancia):
+                    regresiones.append(f"{tam}/{nombre}: {k} {b[k]} → {m[k]}")
+            if b.get("rps") and m["rps"] < b["rps"] / (1 + tolerancia):
+                regresiones.append(f"{tam}/{nombre}: rps {b['rps']} → {m['rps']}")
+    return regresiones
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Benchmark de las rutas calientes del inventario.")
+    ap.add_argument("--tamanos", default="1k", help="Lista separada por comas de " + ", ".join(TAMANOS))
+    ap.add_argument("--repeticiones", type=int, default=200, help="Peticiones medidas por escenario.")
+    ap.add_argument("--memoria", type=int, default=5, help="Peticiones extra bajo tracemalloc por escenario.")
+    ap.add_argument("--archivo-max", type=int, default=20_000, help="Tope de registros en datos.txt/csv/jsonl.")
+    ap.add_argument("--solo", default="", help="Escenarios a ejecutar (coma); vacío = todos.")
+    ap.add_argument("--mysql", choices=("falso", "real"), default="falso")
+    ap.add_argument("--dir", default=None, help="Directorio de trabajo (por defecto uno temporal).")
+    ap.add_argument("--salida", default=None, help="Archivo donde escribir el JSON de resultados.")
+    ap.add_argument("--baseline", default=None, help="JSON de una ejecución anterior con el que comparar.")
+    ap.add_argument("--guardar-baseline", default=None, help="Guarda los resultados como nueva baseline.")
+    ap.add_argument("--import-repeticiones", type=int, default=5, help="Procesos nuevos para medir `import app`.")
+    ap.add_argument("--import-max-ms", type=float, default=None, help="Presupuesto de `import app` (mediana, ms).")
+    ap.add_argument("--tolerancia", type=float, default=0.25, help="Margen antes de considerar regresión (0.25 = 25%%).")
+    args = ap.parse_args(argv)
+
+    tamanos = [t.strip().lower() for t in args.tamanos.split(",") if t.strip()]
+    desconocidos = [t for t in tamanos if t not in TAMANOS]
+    if desconocidos:
+        ap.error(f"tamaños desconocidos: {', '.join(desconocidos)}")
+    solo = {s.strip() for s in args.solo.split(",") if s.strip()}
+
+    trabajo = Path(args.dir or tempfile.mkdtemp(prefix="bench_inventario_"))
+    trabajo.mkdir(parents=True, exist_ok=True)
+    arranque = medir_import(args.import_repeticiones, trabajo) if args.import_repeticiones > 0 else None
+    if arranque:
+        print(f"[arranque] import app mediana={arranque['mediana_ms']}ms max={arranque['max_ms']}ms "
+              f"pesados={','.join(arranque['pesados']) or '-'}", file=sys.stderr)
+    A, falso = preparar_app(trabajo, args.mysql)
+    cliente = A.app.test_client()
+
+    resultados = {}
+    for tam in tamanos:
+        n = TAMANOS[tam]
+        n_archivo = min(n, args.archivo_max)
+        t0 = time.perf_counter()
+        for p in (A.TXT_PATH, A.CSV_PATH, A.JSONL_PATH, Path(str(A.JSONL_PATH) + ".idx"), Path(str(A.CSV_PATH) + ".idx")):
+            Path(p).unlink(missing_ok=True)
+        A._ESCRITORES.clear()
+        A.query_cache.clear()
+        A._TOTAL_CACHE.clear()
+        sembrar_sqlite(A, n)
+        sembrar_archivos(A, n_archivo)
+        sembrar_sqla(A, min(n, 10_000))
+        if falso:
+            falso.sembrar(n, min(n, 1_000), min(n, 10_000))
+        print(f"[{tam}] sembrado en {time.perf_counter() - t0:.1f}s", file=sys.stderr)
+
+        resultados[tam] = {}
+        for nombre, url, factor in escenarios(n, n_archivo):
+            if solo and nombre not in solo:
+                continue
+            if args.mysql == "real" and nombre in ESCRITURAS_MYSQL:
+                print(f"[{tam}] {nombre:24s} omitido (--mysql real es de solo lectura)", file=sys.stderr)
+                continue
+            rep = max(3, int(args.repeticiones * factor))
+            resultados[tam][nombre] = m = medir(cliente, url, rep, min(args.memoria, rep))
+            print(f"[{tam}] {nombre:24s} {m['rps']:>9} req/s  p50={m['p50_ms']}ms  p99={m['p99_ms']}ms  "
+                  f"mem={m['mem_pico_kb']}KB", file=sys.stderr)
+
+    informe = {
+        "meta": {"fecha": time.strftime("%Y-%m-%dT%H:%M:%S"), "python": platform.python_version(),
+                 "sqlite": sqlite3.sqlite_version, "plataforma": platform.platform(), "mysql": args.mysql,
+                 "repeticiones": args.repeticiones},
+        "arranque": arranque,
+        "resultados": resultados,
+    }
+    regresiones = []
+    if args.baseline:
+        base = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        regresiones += comparar(resultados, base["resultados"], args.tolerancia)
+        base_ms = (base.get("arranque") or {}).get("mediana_ms")
+        if arranque and base_ms and arranque["mediana_ms"] > base_ms * (1 + args.tolerancia):
+            regresiones.append(f"import_app: mediana_ms {base_ms} → {arranque['mediana_ms']}")
+    if arranque and args.import_max_ms is not None and arranque["mediana_ms"] > args.import_max_ms:
+        regresiones.append(f"import_app: {arranque['mediana_ms']}ms supera el presupuesto de {args.import_max_ms}ms")
+    if arranque and args.import_max_ms is not None and arranque["pesados"]:
+        regresiones.append(f"import_app: carga {', '.join(arranque['pesados'])} al importar")
+    codigo = 0
+    if args.baseline or args.import_max_ms is not None:
+        informe["regresiones"] = regresiones
+        for r in regresiones:
+            print(f"REGRESIÓN {r}", file=sys.stderr)
+        codigo = 1 if regresiones else 0
+
+    texto = json.dumps(informe, ensure_ascii=False, indent=2)
+    if args.salida:
+        Path(args.salida).write_text(texto, encoding="utf-8")
+    if args.guardar_baseline:
+        Path(args.guardar_baseline).write_text(texto, encoding="utf-8")
+    print(texto)
+    return codigo
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,139 @@
+# buffer_escritura.py
+# Group commit para los archivos de datos/: las altas concurrentes de
+# /txt|csv|json/guardar se encolan y un hilo escritor las vuelca juntas
+# en un solo write() bajo flock (entre procesos), con fsync por lote opcional.
+import atexit
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Optional
+
+try:
+    import fcntl            # POSIX; en Windows (XAMPP) no hay bloqueo entre procesos
+except ImportError:         # pragma: no cover
+    fcntl = None
+
+
+class WriteFailed(Exception):
+    """El lote que contenía este registro no se pudo escribir."""
+
+
+class GroupCommitWriter:
+    """
+    append(data) encola bytes y espera a que su lote esté escrito (y sincronizado
+    si fsync=True). El hilo escritor toma todo lo pendiente: mientras escribe un
+    lote, las nuevas altas se acumulan para el siguiente. Con max_delay > 0 además
+    espera hasta ese tiempo (o hasta max_bytes) para agrupar más.
+    - header: bytes que se escriben primero si el archivo está vacío (cabecera CSV).
+    - on_flush(size_antes, size_despues, n_registros): aviso tras cada lote.
+    """
+
+    def __init__(self, path: Path, max_bytes: int = 64 * 1024, max_delay: float = 0.0,
+                 fsync: bool = False, header: Optional[bytes] = None,
+                 on_flush: Optional[Callable[[int, int, int], None]] = None):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.max_delay = max_delay
+        self.fsync = fsync
+        self.header = header
+        self.on_flush = on_flush
+        self._reset()
+        atexit.register(self.close)
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self._cond = threading.Condition()
+        self._pending = []
+        self._pending_bytes = 0
+        self._seq = 0            # último ticket encolado
+        self._done = 0           # último ticket ya procesado
+        # Lotes fallidos: [desde, hasta, excepción, registros que aún no lo han visto].
+        # Cada ticket del rango lo consulta una vez al despertar y el lote se
+        # descarta cuando lo han visto todos: ninguno puede darlo por escrito.
+        self._fallos = []
+        self._closing = False
+        self._thread = None
+        self.stats = {"registros": 0, "lotes": 0, "bytes": 0, "fsyncs": 0, "errores": 0}
+
+    # ---- API ----
+    def append(self, data: bytes) -> None:
+        if self._pid != os.getpid():
+            self._reset()        # tras fork: ni el hilo ni la cola del padre existen aquí
+        with self._cond:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=f"writer:{self.path.name}", daemon=True)
+                self._thread.start()
+            self._pending.append(data)
+            self._pending_bytes += len(data)
+            self._seq += 1
+            ticket = self._seq
+            self._cond.notify_all()
+            while self._done < ticket:
+                self._cond.wait()
+            for fallo in self._fallos:
+                desde, hasta, exc, _ = fallo
+                if desde <= ticket <= hasta:
+                    fallo[3] -= 1
+                    if not fallo[3]:
+                        self._fallos.remove(fallo)
+                    raise WriteFailed(str(exc)) from exc
+
+    def close(self) -> None:
+        """Vacía lo pendiente y detiene el hilo (también se llama al salir del proceso)."""
+        if self._pid != os.getpid() or self._thread is None:
+            return
+        with self._cond:
+            self._closing = True
+            self._cond.notify_all()
+        self._thread.join(timeout=5)
+
+    # ---- hilo escritor ----
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._closing:
+                    self._cond.wait()
+                if not self._pending:
+                    return
+                if self.max_delay > 0:
+                    limite = time.monotonic() + self.max_delay
+                    while self._pending_bytes < self.max_bytes and not self._closing:
+                        resto = limite - time.monotonic()
+                        if resto <= 0:
+                            break
+                        self._cond.wait(resto)
+                lote, hasta = self._pending, self._seq
+                self._pending, self._pending_bytes = [], 0
+            desde = hasta - len(lote) + 1
+            try:
+                self._write(b"".join(lote), len(lote))
+            except Exception as exc:
+                with self._cond:
+                    self._fallos.append([desde, hasta, exc, len(lote)])
+                    self.stats["errores"] += 1
+            with self._cond:
+                self._done = hasta
+                self._cond.notify_all()
+
+    def _write(self, data: bytes, n: int) -> None:
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            if fcntl:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            size_antes = os.fstat(fd).st_size
+            if self.header and size_antes == 0:
+                data = self.header + data
+            vista = memoryview(data)
+            while vista:
+                vista = vista[os.write(fd, vista):]
+            if self.fsync:
+                os.fsync(fd)
+                self.stats["fsyncs"] += 1
+        finally:
+            os.close(fd)     # cerrar libera también el flock
+        self.stats["registros"] += n
+        self.stats["lotes"] += 1
+        self.stats["bytes"] += len(data)
+        if self.on_flush:
+            self.on_flush(size_antes, size_antes + len(data), n)
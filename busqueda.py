@@ -0,0 +1,84 @@
+# busqueda.py
+# Búsqueda de productos (SQLite) con un índice FTS5 sobre productos.nombre.
+# La tabla FTS es de contenido externo (no duplica los datos) y se mantiene
+# con triggers, así nuevo/editar/eliminar y los importadores la actualizan solos.
+# Si el SQLite del sistema no trae FTS5 se cae a un LIKE equivalente.
+import re
+import sqlite3
+from typing import List, Tuple
+
+FTS_DDL = [
+    """CREATE VIRTUAL TABLE productos_fts USING fts5(
+        nombre, content='productos', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS productos_fts_ai AFTER INSERT ON productos BEGIN
+        INSERT INTO productos_fts(rowid, nombre) VALUES (new.id, new.nombre);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS productos_fts_ad AFTER DELETE ON productos BEGIN
+        INSERT INTO productos_fts(productos_fts, rowid, nombre) VALUES ('delete', old.id, old.nombre);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS productos_fts_au AFTER UPDATE OF nombre ON productos BEGIN
+        INSERT INTO productos_fts(productos_fts, rowid, nombre) VALUES ('delete', old.id, old.nombre);
+        INSERT INTO productos_fts(rowid, nombre) VALUES (new.id, new.nombre);
+    END""",
+]
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+def crear_fts(conn) -> bool:
+    """Crea (una vez) el índice FTS5 y lo llena con los productos existentes. False si no hay FTS5."""
+    if conn.execute("SELECT 1 FROM sqlite_master WHERE name='productos_fts'").fetchone():
+        return True
+    # Savepoint propio: si falla sólo se deshace esto, no la transacción del llamante (init_db)
+    conn.execute("SAVEPOINT crear_fts")
+    try:
+        for ddl in FTS_DDL:
+            conn.execute(ddl)
+        conn.execute("INSERT INTO productos_fts(productos_fts) VALUES ('rebuild')")
+    except sqlite3.OperationalError:
+        conn.execute("ROLLBACK TO crear_fts")
+        conn.execute("RELEASE crear_fts")
+        return False
+    conn.execute("RELEASE crear_fts")
+    return True
+
+
+def fts_disponible(conn) -> bool:
+    return conn.execute("SELECT 1 FROM sqlite_master WHERE name='productos_fts'").fetchone() is not None
+
+
+def fts_query(q: str) -> str:
+    """'audi son' -> '"audi"* "son"*': todas las palabras, cada una como prefijo."""
+    return " ".join('"{}"*'.format(t.replace('"', '""')) for t in _TOKEN.findall(q))
+
+
+def buscar_productos(conn, q: str, limit: int, offset: int) -> Tuple[List[sqlite3.Row], int, int, float]:
+    """
+    Página de resultados ordenada por relevancia (bm25) y, calculados en SQL
+    sobre todo el resultado: (filas, total, total_items, total_valor).
+    """
+    if fts_disponible(conn):
+        match = fts_query(q)
+        if not match:
+            return [], 0, 0, 0.0
+        desde = "FROM productos_fts f JOIN productos p ON p.id = f.rowid WHERE productos_fts MATCH ?"
+        orden = "ORDER BY f.rank, p.id"
+        params = (match,)
+    else:
+        patron = "%" + q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        desde = "FROM productos p WHERE p.nombre LIKE ? ESCAPE '\\'"
+        orden = "ORDER BY p.id"
+        params = (patron,)
+    total, items, valor = conn.execute(
+        f"SELECT COUNT(*), COALESCE(SUM(p.cantidad), 0), COALESCE(SUM(p.cantidad * p.precio), 0) {desde}",
+        params
+    ).fetchone()
+    if not total:
+        return [], 0, 0, 0.0
+    filas = conn.execute(
+        f"SELECT p.id, p.nombre, p.cantidad, p.precio {desde} {orden} LIMIT ? OFFSET ?",
+        (*params, limit, offset)
+    ).fetchall()
+    return filas, total, items, valor
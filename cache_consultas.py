@@ -0,0 +1,52 @@
+# cache_consultas.py
+# Caché de resultados para los helpers MySQL (mysql_fetch_all / mysql_scalar).
+# Clave: (tipo, SQL, parámetros). Cada entrada guarda la versión de las tablas
+# que lee (ver versiones.py); si alguna cambió desde entonces es un fallo.
+# LRU acotado y TTL como red de seguridad frente a escrituras externas.
+import copy
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable
+
+from versiones import TableVersions
+
+
+class QueryCache:
+    def __init__(self, versiones: TableVersions, maxsize: int = 512, ttl: float = 60):
+        self.versiones = versiones
+        self.maxsize = max(1, maxsize)
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()   # clave -> (expira, versiones, valor)
+        self._lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    def fetch(self, key: Hashable, tablas: Iterable[str], loader: Callable[[], Any]) -> Any:
+        """Devuelve una copia del valor cacheado o lo carga con `loader` y lo guarda."""
+        vers = self.versiones.get(tablas)
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None and item[0] > time.monotonic() and item[1] == vers:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return copy.deepcopy(item[2])
+            self.misses += 1
+        # Las versiones se leyeron antes de consultar: una escritura concurrente deja la entrada ya caducada
+        valor = loader()
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, vers, copy.deepcopy(valor))
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        return valor
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {"entradas": len(self._data), "max": self.maxsize, "ttl": self.ttl,
+                    "hits": self.hits, "misses": self.misses,
+                    "hit_ratio": round(self.hits / total, 4) if total else 0.0}
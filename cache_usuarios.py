@@ -0,0 +1,114 @@
+# cache_usuarios.py
+# Caché de objetos User para el user_loader de Flask-Login: evita ir a MySQL
+# en cada petición autenticada. Dos variantes con la misma interfaz:
+#   - UserCache: en memoria del proceso, TTL + LRU acotado.
+#   - SharedUserCache: archivo SQLite compartido por todos los workers; una
+#     invalidación la ven todos al instante.
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+import sqlite_db
+
+
+class UserCache:
+    def __init__(self, maxsize: int = 1024, ttl: float = 300):
+        self.maxsize = max(1, maxsize)
+        self.ttl = ttl
+        self._data: "OrderedDict[int, tuple]" = OrderedDict()   # id -> (expira, user)
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.invalidaciones = 0
+
+    def get(self, uid: int) -> Optional[Any]:
+        with self._lock:
+            item = self._data.get(uid)
+            if item is not None and item[0] > time.monotonic():
+                self._data.move_to_end(uid)
+                self.hits += 1
+                return item[1]
+            if item is not None:
+                del self._data[uid]
+            self.misses += 1
+            return None
+
+    def put(self, uid: int, user: Any) -> None:
+        with self._lock:
+            self._data[uid] = (time.monotonic() + self.ttl, user)
+            self._data.move_to_end(uid)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, uid: int) -> None:
+        with self._lock:
+            self._data.pop(uid, None)
+            self.invalidaciones += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {"tipo": type(self).__name__, "entradas": len(self._data), "max": self.maxsize,
+                    "ttl": self.ttl, "hits": self.hits, "misses": self.misses,
+                    "invalidaciones": self.invalidaciones,
+                    "hit_ratio": round(self.hits / total, 4) if total else 0.0}
+
+
+class SharedUserCache(UserCache):
+    """
+    Misma política sobre un archivo SQLite (WAL) compartido entre procesos.
+    Guarda los campos del usuario y reconstruye el objeto con `factory`.
+    Los contadores de hits/misses son por proceso.
+    """
+
+    def __init__(self, path: str, factory, maxsize: int = 1024, ttl: float = 300):
+        super().__init__(maxsize, ttl)
+        self.path = path
+        self.factory = factory
+        conn = sqlite_db.conectar(self.path)
+        conn.execute("""CREATE TABLE IF NOT EXISTS user_cache(
+            id INTEGER PRIMARY KEY, nombre TEXT NOT NULL, email TEXT NOT NULL, expira REAL NOT NULL)""")
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_user_cache_expira ON user_cache(expira)")
+        conn.commit()
+
+    def get(self, uid: int) -> Optional[Any]:
+        row = sqlite_db.conectar(self.path).execute(
+            "SELECT nombre, email FROM user_cache WHERE id=? AND expira>?", (uid, time.time())
+        ).fetchone()
+        with self._lock:
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return self.factory(uid, row["nombre"], row["email"])
+
+    def put(self, uid: int, user: Any) -> None:
+        conn = sqlite_db.conectar(self.path)
+        with conn:
+            conn.execute("INSERT OR REPLACE INTO user_cache(id, nombre, email, expira) VALUES (?,?,?,?)",
+                         (uid, user.nombre, user.email, time.time() + self.ttl))
+            # Acotado: fuera lo caducado y, si aún sobra, lo que antes caduca (≈ LRU por llenado)
+            conn.execute("DELETE FROM user_cache WHERE expira<=?", (time.time(),))
+            conn.execute("""DELETE FROM user_cache WHERE id IN (
+                SELECT id FROM user_cache ORDER BY expira
+                LIMIT max(0, (SELECT COUNT(*) FROM user_cache) - ?))""", (self.maxsize,))
+
+    def invalidate(self, uid: int) -> None:
+        conn = sqlite_db.conectar(self.path)
+        with conn:
+            conn.execute("DELETE FROM user_cache WHERE id=?", (uid,))
+        with self._lock:
+            self.invalidaciones += 1
+
+    def clear(self) -> None:
+        conn = sqlite_db.conectar(self.path)
+        with conn:
+            conn.execute("DELETE FROM user_cache")
+
+    def stats(self) -> Dict[str, Any]:
+        s = super().stats()
+        s["entradas"] = sqlite_db.conectar(self.path).execute("SELECT COUNT(*) FROM user_cache").fetchone()[0]
+        return s
@@ -0,0 +1,178 @@
+# demo_sqla.py
+# Demo SQLAlchemy (tabla usuarios en database/usuarios.db). app.py lo importa
+# y crea el motor en el primer uso (ver subsistemas.py), no al arrancar.
+#   - escrituras: Core insert() con executemany, una transacción por lote;
+#     AltasAgrupadas junta las altas concurrentes en commits compartidos
+#   - lecturas: tuplas de Core por páginas de clave (id > cursor), sin ORM
+import os
+import threading
+import time
+from typing import Callable, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import create_engine, event, insert, select, Column, Integer, String
+from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.pool import QueuePool, StaticPool
+
+import sqlite_db
+from metricas import metricas
+
+Base = declarative_base()
+
+class Usuario(Base):
+    __tablename__ = "usuarios"
+    id     = Column(Integer, primary_key=True)
+    nombre = Column(String(80), nullable=False)
+    email  = Column(String(120), nullable=False)
+
+
+def _sqla_inicio(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("_t0", []).append(time.perf_counter())
+
+def _sqla_fin(conn, cursor, statement, parameters, context, executemany):
+    metricas.consulta("sqla", statement, parameters, time.perf_counter() - conn.info["_t0"].pop())
+
+
+def _pragmas(dbapi_conn, _registro):
+    # Los mismos ajustes que las conexiones de inventario.db (WAL, busy_timeout...)
+    cur = dbapi_conn.cursor()
+    for nombre, valor in sqlite_db.PRAGMAS.items():
+        cur.execute(f"PRAGMA {nombre}={valor}")
+    cur.close()
+
+
+def crear(url: str, pool_size: int = 5, max_overflow: int = 10):
+    """
+    Motor instrumentado con las tablas creadas y su fábrica de sesiones: (engine, Session).
+    SQLite en archivo: pool acotado compartido entre hilos (check_same_thread=False;
+    cada conexión la usa un solo hilo a la vez) con WAL y busy_timeout, así las
+    lecturas no esperan al escritor. ":memory:" usa una única conexión (StaticPool).
+    """
+    kwargs = {}
+    if url.startswith("sqlite"):
+        opciones = {"check_same_thread": False, "timeout": sqlite_db.BUSY_TIMEOUT_MS / 1000}
+        if url in ("sqlite://", "sqlite:///:memory:"):
+            kwargs = {"poolclass": StaticPool, "connect_args": opciones}
+        else:
+            kwargs = {"poolclass": QueuePool, "pool_size": pool_size, "max_overflow": max_overflow,
+                      "pool_timeout": 30, "connect_args": opciones}
+    engine = create_engine(url, echo=False, future=True, **kwargs)
+    if url.startswith("sqlite"):
+        event.listen(engine, "connect", _pragmas)
+    event.listen(engine, "before_cursor_execute", _sqla_inicio)
+    event.listen(engine, "after_cursor_execute", _sqla_fin)
+    Base.metadata.create_all(engine)
+    return engine, sessionmaker(bind=engine, expire_on_commit=False)
+
+
+# ---------------------- Core: lotes y páginas -------------------
+def insertar(engine, filas: Sequence[dict]) -> List[int]:
+    """Inserta [{"nombre", "email"}, ...] en una transacción (executemany); ids en el mismo orden."""
+    if not filas:
+        return []
+    t = Usuario.__table__
+    with engine.begin() as conn:
+        res = conn.execute(insert(t).returning(t.c.id, sort_by_parameter_order=True), list(filas))
+        return [r[0] for r in res]
+
+
+def pagina(engine, despues_de: int = 0, limite: int = 500) -> List[Tuple[int, str, str]]:
+    """Hasta `limite` filas (id, nombre, email) con id > despues_de, en orden de id."""
+    t = Usuario.__table__
+    with engine.connect() as conn:
+        return conn.execute(select(t.c.id, t.c.nombre, t.c.email)
+                            .where(t.c.id > despues_de).order_by(t.c.id).limit(limite)).all()
+
+
+def recorrer(engine, lote: int = 1000) -> Iterator[Tuple[int, str, str]]:
+    """Toda la tabla por páginas de clave: memoria acotada y sin transacción larga abierta."""
+    ultimo = 0
+    while True:
+        filas = pagina(engine, ultimo, lote)
+        yield from filas
+        if len(filas) < lote:
+            return
+        ultimo = filas[-1][0]
+
+
+class AltaFallida(Exception):
+    """El lote que contenía esta alta no se pudo guardar."""
+
+
+class AltasAgrupadas:
+    """
+    Cola de altas con commit agrupado (mismo esquema que buffer_escritura):
+    agregar() encola y espera a que su lote esté confirmado; un hilo toma todo
+    lo pendiente (hasta max_lote) y lo inserta con insertar(), así N peticiones
+    concurrentes pagan un solo commit. Con max_delay > 0 espera ese tiempo a
+    que lleguen más. on_commit(n) se llama tras cada lote confirmado.
+    """
+
+    def __init__(self, engine, max_lote: int = 500, max_delay: float = 0.0,
+                 on_commit: Optional[Callable[[int], None]] = None):
+        self.engine = engine
+        self.max_lote = max_lote
+        self.max_delay = max_delay
+        self.on_commit = on_commit
+        self._pid = os.getpid()
+        self._cond = threading.Condition()
+        self._pending: List[dict] = []
+        self._seq = 0            # último ticket encolado
+        self._done = 0           # último ticket procesado
+        self._ids = {}           # ticket -> id asignado (o excepción)
+        self._closing = False
+        self._thread = None
+        self.stats = {"altas": 0, "lotes": 0, "errores": 0}
+
+    def agregar(self, nombre: str, email: str) -> int:
+        with self._cond:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="altas:usuarios", daemon=True)
+                self._thread.start()
+            self._pending.append({"nombre": nombre, "email": email})
+            self._seq += 1
+            ticket = self._seq
+            self._cond.notify_all()
+            while self._done < ticket:
+                self._cond.wait()
+            res = self._ids.pop(ticket)
+        if isinstance(res, Exception):
+            raise AltaFallida(str(res)) from res
+        return res
+
+    def close(self) -> None:
+        if self._pid != os.getpid() or self._thread is None:
+            return
+        with self._cond:
+            self._closing = True
+            self._cond.notify_all()
+        self._thread.join(timeout=5)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._closing:
+                    self._cond.wait()
+                if not self._pending:
+                    return
+                if self.max_delay > 0:
+                    limite = time.monotonic() + self.max_delay
+                    while len(self._pending) < self.max_lote and not self._closing:
+                        resto = limite - time.monotonic()
+                        if resto <= 0:
+                            break
+                        self._cond.wait(resto)
+                lote, self._pending = self._pending[:self.max_lote], self._pending[self.max_lote:]
+                desde = self._done + 1
+            try:
+                res = insertar(self.engine, lote)
+                self.stats["lotes"] += 1
+                self.stats["altas"] += len(lote)
+                if self.on_commit:
+                    self.on_commit(len(lote))
+            except Exception as exc:
+                res = [exc] * len(lote)
+                self.stats["errores"] += 1
+            with self._cond:
+                self._ids.update(zip(range(desde, desde + len(lote)), res))
+                self._done = desde + len(lote) - 1
+                self._cond.notify_all()
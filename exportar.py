@@ -0,0 +1,99 @@
+# exportar.py
+# Exportación en streaming (CSV / NDJSON, gzip opcional) de las tablas de
+# productos y categorías. Las filas se leen por bloques con fetchmany (cursor
+# sin buffer en MySQL) y se van escribiendo, así la memoria no depende del
+# tamaño de la tabla.
+import csv
+import io
+import json
+import zlib
+from decimal import Decimal
+from typing import Callable, Iterable, Iterator, Sequence, Tuple
+
+LOTE = 1000
+FORMATOS = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+
+def filas_sqlite(conn, sql: str, params=(), lote: int = LOTE) -> Iterator[Tuple]:
+    """Primero la tupla de nombres de columna, luego las filas (tuplas) por bloques."""
+    cur = conn.execute(sql, params)
+    try:
+        yield tuple(d[0] for d in cur.description)
+        while True:
+            bloque = cur.fetchmany(lote)
+            if not bloque:
+                return
+            yield from (tuple(r) for r in bloque)
+    finally:
+        cur.close()
+
+
+def filas_mysql(get_connection: Callable, sql: str, params=(), lote: int = LOTE) -> Iterator[Tuple]:
+    """
+    Igual que filas_sqlite sobre una conexión propia del pool y un cursor sin
+    buffer (el servidor envía las filas a medida que se leen). Si el cliente
+    corta la descarga, la conexión se desconecta para que el pool la descarte
+    en vez de reutilizarla con resultados pendientes.
+    """
+    conn = get_connection()
+    completo = False
+    try:
+        cur = conn.cursor(buffered=False)
+        cur.execute(sql, params)
+        yield tuple(cur.column_names)
+        while True:
+            bloque = cur.fetchmany(lote)
+            if not bloque:
+                break
+            yield from bloque
+        cur.close()
+        completo = True
+    finally:
+        if not completo:
+            try: conn.disconnect()
+            except Exception: pass
+        conn.close()
+
+
+def _json_default(o):
+    return float(o) if isinstance(o, Decimal) else str(o)
+
+
+def csv_stream(filas: Iterable[Sequence], lote: int = LOTE) -> Iterator[bytes]:
+    filas = iter(filas)
+    buf = io.StringIO()
+    w = csv.writer(buf)
+    w.writerow(next(filas))
+    for i, fila in enumerate(filas, 1):
+        w.writerow(fila)
+        if i % lote == 0:
+            yield buf.getvalue().encode("utf-8")
+            buf.seek(0); buf.truncate()
+    yield buf.getvalue().encode("utf-8")
+
+
+def ndjson_stream(filas: Iterable[Sequence], lote: int = LOTE) -> Iterator[bytes]:
+    filas = iter(filas)
+    cols = next(filas)
+    partes = []
+    for fila in filas:
+        partes.append(json.dumps(dict(zip(cols, fila)), ensure_ascii=False, default=_json_default))
+        if len(partes) >= lote:
+            yield ("\n".join(partes) + "\n").encode("utf-8")
+            partes = []
+    if partes:
+        yield ("\n".join(partes) + "\n").encode("utf-8")
+
+
+def gzip_stream(chunks: Iterable[bytes], nivel: int = 6) -> Iterator[bytes]:
+    z = zlib.compressobj(nivel, zlib.DEFLATED, 31)    # wbits=31: formato gzip
+    for chunk in chunks:
+        out = z.compress(chunk)
+        if out:
+            yield out
+    yield z.flush()
+
+
+def stream(formato: str, filas: Iterable[Sequence], comprimir: bool = False) -> Iterator[bytes]:
+    chunks = csv_stream(filas) if formato == "csv" else ndjson_stream(filas)
+    return gzip_stream(chunks) if comprimir else chunks
@@ -0,0 +1,42 @@
+# formularios.py
+# Formularios Flask-WTF de la app. Separados de app.py para que WTForms (y el
+# validador de email) se importen con el primer formulario, no al arrancar.
+from flask_wtf import FlaskForm
+from wtforms import StringField, IntegerField, DecimalField, SubmitField, PasswordField
+from wtforms.validators import DataRequired, Length, NumberRange, Email
+
+class ProductoForm(FlaskForm):
+    nombre   = StringField("Nombre", validators=[DataRequired(), Length(min=2, max=50)])
+    cantidad = IntegerField("Cantidad", validators=[DataRequired(), NumberRange(min=0)])
+    precio   = DecimalField("Precio", places=2, validators=[DataRequired(), NumberRange(min=0)])
+    enviar   = SubmitField("Guardar")
+
+class DeleteForm(FlaskForm):
+    enviar = SubmitField("Eliminar")
+
+class UsuarioMySQLForm(FlaskForm):
+    nombre = StringField("Nombre", validators=[DataRequired(), Length(min=2, max=100)])
+    email  = StringField("Email",  validators=[DataRequired(), Email(), Length(max=120)])
+    enviar = SubmitField("Agregar")
+
+class RegisterForm(FlaskForm):
+    nombre = StringField("Nombre", validators=[DataRequired(), Length(min=2, max=100)])
+    email  = StringField("Email", validators=[DataRequired(), Email(), Length(max=120)])
+    password = PasswordField("Contraseña", validators=[DataRequired(), Length(min=6, max=128)])
+    enviar = SubmitField("Crear cuenta")
+
+class LoginForm(FlaskForm):
+    email  = StringField("Email", validators=[DataRequired(), Email(), Length(max=120)])
+    password = PasswordField("Contraseña", validators=[DataRequired(), Length(min=6, max=128)])
+    enviar = SubmitField("Iniciar sesión")
+
+# Nueva: Categorías (MySQL)
+class CategoriaMySQLForm(FlaskForm):
+    nombre = StringField("Nombre", validators=[DataRequired(), Length(min=2, max=80)])
+    enviar = SubmitField("Guardar")
+
+class ProductoMySQLForm(FlaskForm):
+    nombre = StringField("Nombre", validators=[DataRequired(), Length(min=2, max=100)])
+    precio = DecimalField("Precio", places=2, validators=[DataRequired(), NumberRange(min=0)])
+    stock  = IntegerField("Stock", validators=[DataRequired(), NumberRange(min=0)])
+    enviar = SubmitField("Guardar")
@@ -0,0 +1,157 @@
+# hash_claves.py
+# Hash de contraseñas fuera del hilo de la petición. generate/check_password_hash
+# son caros a propósito (scrypt/pbkdf2): inline, una ráfaga de logins ocupa
+# todos los hilos del worker. Aquí corren en un pool de procesos (no compiten
+# por el GIL con las demás rutas) con concurrencia acotada: si ya hay
+# PASSWORD_HASH_PROCESOS trabajando y PASSWORD_HASH_COLA esperando, la
+# siguiente petición se rechaza al momento con Saturado (503 en app.py).
+#
+# PASSWORD_HASH_METODO fija el algoritmo/parámetros (formato de werkzeug,
+# p. ej. "scrypt:32768:8:1" o "pbkdf2:sha256:600000"); los hashes con otros
+# parámetros se rehacen en el siguiente login correcto (necesita_rehash).
+# multiprocessing y concurrent.futures.process se importan al crear el pool
+# (primer hash), no al importar app (ver subsistemas.py)
+import os
+import threading
+import time
+from typing import Any, Dict
+
+from werkzeug.security import generate_password_hash, check_password_hash
+
+from metricas import metricas
+
+PROCESOS = int(os.environ.get("PASSWORD_HASH_PROCESOS", max(1, min(4, (os.cpu_count() or 1)))))
+COLA     = int(os.environ.get("PASSWORD_HASH_COLA", 16))        # esperando además de los que trabajan
+TIMEOUT  = float(os.environ.get("PASSWORD_HASH_TIMEOUT", 10))   # seg. máximos por operación
+METODO   = os.environ.get("PASSWORD_HASH_METODO") or "scrypt"   # el por defecto de werkzeug 3
+
+
+class Saturado(Exception):
+    """No hay hueco en el pool de hash (o no respondió a tiempo): reintentar más tarde."""
+
+
+def _generar(password: str, metodo: str) -> str:
+    return generate_password_hash(password, metodo)
+
+
+def prefijo(metodo: str) -> str:
+    """
+    Lo que werkzeug escribe antes del primer "$" para `metodo`, con los
+    parámetros omitidos completados como hace él ("scrypt" -> "scrypt:32768:8:1").
+    """
+    nombre, *args = metodo.split(":")
+    if nombre == "scrypt" and not args:
+        return f"scrypt:{2 ** 15}:8:1"
+    if nombre == "pbkdf2" and len(args) < 2:
+        from werkzeug.security import DEFAULT_PBKDF2_ITERATIONS
+        return f"pbkdf2:{args[0] if args else 'sha256'}:{DEFAULT_PBKDF2_ITERATIONS}"
+    return metodo
+
+
+def _verificar(pwhash: str, password: str) -> bool:
+    return check_password_hash(pwhash, password)
+
+
+class HashClaves:
+    """
+    generar(password) / verificar(hash, password) bloquean al llamante hasta el
+    resultado, pero el cálculo ocurre en otro proceso. El pool se crea en el
+    primer uso y otra vez tras un fork o si un proceso hijo muere.
+    """
+
+    def __init__(self, procesos: int = PROCESOS, cola: int = COLA, timeout: float = TIMEOUT,
+                 metodo: str = METODO):
+        self.procesos = procesos
+        self.cola = cola
+        self.timeout = timeout
+        self.metodo = metodo
+        self._pool = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._en_curso = 0
+        self._gen = 0            # generación del pool: los avisos de un pool ya descartado no cuentan
+        self._stats = {"operaciones": 0, "rechazos": 0, "timeouts": 0, "rehashes": 0}
+
+    # ---- API ----
+    def generar(self, password: str) -> str:
+        return self._ejecutar("generar", _generar, password, self.metodo)
+
+    def verificar(self, pwhash: str, password: str) -> bool:
+        return self._ejecutar("verificar", _verificar, pwhash, password)
+
+    def necesita_rehash(self, pwhash: str) -> bool:
+        """True si el hash se hizo con otro algoritmo o parámetros que los configurados."""
+        return pwhash.split("$", 1)[0] != prefijo(self.metodo)
+
+    def rehash_hecho(self) -> None:
+        with self._lock:
+            self._stats["rehashes"] += 1
+
+    def estado(self) -> Dict[str, Any]:
+        with self._lock:
+            en_curso = self._en_curso
+            return {**self._stats, "procesos": self.procesos, "cola_max": self.cola,
+                    "en_curso": en_curso, "en_cola": max(0, en_curso - self.procesos),
+                    "iniciado": self._pid == os.getpid()}
+
+    def cerrar(self) -> None:
+        with self._lock:
+            if self._pool is not None and self._pid == os.getpid():
+                self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = self._pid = None
+
+    # ---- interno ----
+    def _ejecutor(self):
+        if self._pid != os.getpid():
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+            # spawn: los hijos no heredan hilos ni conexiones del worker
+            self._pool = ProcessPoolExecutor(self.procesos, mp_context=multiprocessing.get_context("spawn"))
+            self._pid = os.getpid()
+            self._en_curso = 0
+            self._gen += 1
+        return self._pool
+
+    def _liberar(self, gen: int) -> None:
+        with self._lock:
+            if gen == self._gen:
+                self._en_curso -= 1
+
+    def _ejecutar(self, op: str, fn, *args):
+        from concurrent.futures import TimeoutError as FuturoTimeout
+        from concurrent.futures.process import BrokenProcessPool
+        t0 = time.perf_counter()
+        with self._lock:
+            pool = self._ejecutor()
+            if self._en_curso >= self.procesos + self.cola:
+                self._stats["rechazos"] += 1
+                metricas.contar("password_hash_rejected_total", op=op)
+                raise Saturado("pool de hash lleno")
+            self._en_curso += 1
+            self._stats["operaciones"] += 1
+            gen = self._gen
+        try:
+            futuro = pool.submit(fn, *args)
+        except BrokenProcessPool as e:
+            self._liberar(gen)
+            self.cerrar()
+            raise Saturado("pool de hash reiniciado") from e
+        # El hueco se libera cuando la tarea termina, aunque aquí se deje de esperar antes
+        futuro.add_done_callback(lambda _f: self._liberar(gen))
+        try:
+            return futuro.result(timeout=self.timeout)
+        except FuturoTimeout as e:
+            with self._lock:
+                self._stats["timeouts"] += 1
+            metricas.contar("password_hash_rejected_total", op=op)
+            raise Saturado(f"hash sin respuesta tras {self.timeout}s") from e
+        except BrokenProcessPool as e:
+            self.cerrar()
+            raise Saturado("pool de hash reiniciado") from e
+        finally:
+            metricas.observar("password_hash_duration_seconds", time.perf_counter() - t0, op=op)
+
+
+hash_claves = HashClaves()
+metricas.describir("password_hash_duration_seconds", "Latencia de hash/verificación de contraseñas (incluye la cola).")
+metricas.describir("password_hash_rejected_total", "Operaciones de hash rechazadas por pool lleno o sin respuesta.")
@@ -0,0 +1,141 @@
+# importador.py
+# Motor de importación masiva a SQLite (productos) usado por /import/*.
+# Agrupa las filas en lotes: una transacción por lote, executemany con
+# UPSERT nativo (requiere índice único en productos.nombre) y nombres
+# repetidos fusionados en memoria para escribir cada producto una vez por lote.
+# Los checkpoints por archivo se guardan en la misma transacción que cada lote,
+# así una reimportación sólo procesa lo nuevo y nunca aplica dos veces una fila.
+import os
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+CHUNK_SIZE = 5000
+
+UPSERT_SQL = """
+INSERT INTO productos(nombre, cantidad, precio) VALUES (?, ?, ?)
+ON CONFLICT(nombre) DO UPDATE SET
+    cantidad = cantidad + excluded.cantidad,
+    precio   = excluded.precio
+"""
+
+Registro = Tuple[str, int, float]   # (nombre, cantidad, precio)
+
+CHECKPOINT_DDL = """
+CREATE TABLE IF NOT EXISTS import_checkpoints(
+    archivo TEXT PRIMARY KEY,
+    inode   INTEGER NOT NULL,
+    size    INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    pos     INTEGER NOT NULL,
+    actualizado TEXT NOT NULL DEFAULT (datetime('now'))
+)"""
+
+
+class Checkpoint:
+    """
+    Hasta dónde se importó un archivo: `pos` es un offset en bytes (TXT/CSV)
+    o un índice de registro (JSON). La identidad (inode, size, mtime) detecta
+    si el archivo fue reemplazado o truncado, y en ese caso se empieza de cero.
+    """
+
+    def __init__(self, conn, path: Path, reiniciar: bool = False):
+        self.archivo = str(Path(path).resolve())
+        st = os.stat(path)
+        self.inode, self.size, self.mtime_ns = st.st_ino, st.st_size, st.st_mtime_ns
+        row = conn.execute(
+            "SELECT inode, size, mtime_ns, pos FROM import_checkpoints WHERE archivo=?", (self.archivo,)
+        ).fetchone()
+        self.desde = 0
+        self.al_dia = False
+        if row and not reiniciar and row[0] == self.inode and self.size >= max(row[1], row[3]):
+            self.desde = row[3]
+            # Mismo tamaño y mtime que la última vez: no hay nada nuevo que leer
+            self.al_dia = self.size == row[1] and self.mtime_ns == row[2]
+        self.pos = self.desde
+
+    def save(self, conn) -> None:
+        conn.execute(
+            "INSERT INTO import_checkpoints(archivo, inode, size, mtime_ns, pos) VALUES (?,?,?,?,?) "
+            "ON CONFLICT(archivo) DO UPDATE SET inode=excluded.inode, size=excluded.size, "
+            "mtime_ns=excluded.mtime_ns, pos=excluded.pos, actualizado=datetime('now')",
+            (self.archivo, self.inode, self.size, self.mtime_ns, self.pos)
+        )
+
+
+class BulkImporter:
+    """
+    Uso:
+        imp = BulkImporter(get_conn)
+        cp = imp.checkpoint(path)   # opcional: importación incremental de un archivo
+        n = imp.run(registros)      # se puede llamar varias veces (txt, json, csv)
+        stats = imp.finish()        # vacía el último lote y devuelve métricas
+    Los generadores de registros deben actualizar cp.pos antes de cada yield.
+    """
+
+    def __init__(self, get_conn: Callable, chunk_size: int = CHUNK_SIZE,
+                 on_commit: Optional[Callable[[], None]] = None):
+        self.conn = get_conn()
+        self.on_commit = on_commit      # aviso tras cada lote con filas confirmadas
+        self.chunk_size = max(1, int(chunk_size))
+        self._lote: Dict[str, List] = {}     # nombre -> [cantidad acumulada, último precio]
+        self._filas_lote = 0
+        self._checkpoints: List[Checkpoint] = []
+        self._t0 = time.perf_counter()
+        self.stats = {"procesados": 0, "escritos": 0, "lotes": 0}
+
+    def checkpoint(self, path: Path, reiniciar: bool = False) -> Checkpoint:
+        cp = Checkpoint(self.conn, path, reiniciar)
+        self._checkpoints.append(cp)
+        return cp
+
+    def add(self, nombre: str, cantidad: int, precio: float) -> bool:
+        nombre = (nombre or "").strip()
+        if not nombre:
+            return False
+        acc = self._lote.get(nombre)
+        if acc is None:
+            self._lote[nombre] = [max(0, cantidad), max(0.0, precio)]
+        else:
+            acc[0] += max(0, cantidad)
+            acc[1] = max(0.0, precio)
+        self._filas_lote += 1
+        self.stats["procesados"] += 1
+        if self._filas_lote >= self.chunk_size:
+            self.flush()
+        return True
+
+    def run(self, registros: Iterable[Registro]) -> int:
+        """Consume un iterable de registros; devuelve cuántos se aceptaron."""
+        antes = self.stats["procesados"]
+        for nombre, cantidad, precio in registros:
+            self.add(nombre, cantidad, precio)
+        return self.stats["procesados"] - antes
+
+    def flush(self) -> None:
+        if not self._lote and not self._checkpoints:
+            return
+        filas = [(n, c, p) for n, (c, p) in self._lote.items()]
+        try:
+            if filas:
+                self.conn.executemany(UPSERT_SQL, filas)
+            for cp in self._checkpoints:
+                cp.save(self.conn)
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+        self.stats["escritos"] += len(filas)
+        self.stats["lotes"] += 1 if filas else 0
+        if filas and self.on_commit:
+            self.on_commit()
+        self._lote.clear()
+        self._filas_lote = 0
+
+    def finish(self) -> Dict[str, float]:
+        # La conexión es la gestionada por get_conn (reutilizada por hilo): no se cierra aquí
+        self.flush()
+        segundos = time.perf_counter() - self._t0
+        self.stats["segundos"] = round(segundos, 4)
+        self.stats["filas_por_seg"] = round(self.stats["procesados"] / segundos, 1) if segundos else 0.0
+        return dict(self.stats)
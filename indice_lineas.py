@@ -0,0 +1,151 @@
+# indice_lineas.py
+# Índice lateral de offsets para los archivos de datos/ (datos.txt.idx, ...):
+# permite leer la página N o los últimos K registros con un par de lecturas
+# posicionadas y un slice de mmap, sin recorrer el archivo. Se actualiza incrementalmente:
+# cada consulta sólo indexa lo añadido desde la anterior.
+#
+# Formato: cabecera <QQQQ> (inode, inicio_datos, bytes_indexados, n_registros)
+# seguida de n_registros offsets <Q> con el byte donde termina cada registro.
+import csv
+import io
+import json
+import mmap
+import os
+import struct
+from pathlib import Path
+from typing import Any, List, Tuple
+
+from lectores import iter_lineas_desde, iter_csv_desde, iter_jsonl_desde
+
+try:
+    import fcntl
+except ImportError:         # pragma: no cover
+    fcntl = None
+
+_CAB = struct.Struct("<QQQQ")
+_OFF = struct.Struct("<Q")
+MODOS = ("txt", "csv", "jsonl")
+_O_BINARY = getattr(os, "O_BINARY", 0)     # Windows: sin él os.open traduce \r\n
+
+
+# seek + read/write en vez de os.pread/os.pwrite, que no existen en Windows (XAMPP)
+def _leer_en(fd: int, n: int, pos: int) -> bytes:
+    os.lseek(fd, pos, os.SEEK_SET)
+    partes = []
+    while n > 0:
+        trozo = os.read(fd, n)
+        if not trozo:
+            break
+        partes.append(trozo)
+        n -= len(trozo)
+    return b"".join(partes)
+
+
+def _escribir_en(fd: int, data: bytes, pos: int) -> None:
+    os.lseek(fd, pos, os.SEEK_SET)
+    vista = memoryview(data)
+    while vista:
+        vista = vista[os.write(fd, vista):]
+
+
+class LineIndex:
+    """Índice de registros de `path`; modo: "txt" (líneas), "csv" (filas) o "jsonl" (objetos válidos)."""
+
+    def __init__(self, path: Path, modo: str = "txt"):
+        if modo not in MODOS:
+            raise ValueError(f"modo desconocido: {modo}")
+        self.path = Path(path)
+        self.modo = modo
+        self.idx_path = self.path.with_name(self.path.name + ".idx")
+        self.inicio = 0
+        self.total = 0
+
+    # ---- construcción incremental ----
+    def _fines(self, desde: int):
+        """(fin del registro o None si la línea no es un registro, offset consumido)."""
+        if self.modo == "txt":
+            for _, fin in iter_lineas_desde(self.path, desde):
+                yield fin, fin
+        elif self.modo == "jsonl":
+            for obj, fin in iter_jsonl_desde(self.path, desde):
+                yield (fin if obj is not None else None), fin
+        else:
+            for _, fin in iter_csv_desde(self.path, desde):
+                yield fin, fin
+
+    def _inicio_datos(self) -> int:
+        if self.modo != "csv":
+            return 0
+        with open(self.path, "rb") as f:
+            header = f.readline()
+        return len(header) if header.endswith(b"\n") else 0
+
+    def actualizar(self) -> int:
+        """Pone el índice al día con el archivo y devuelve el nº de registros."""
+        st = os.stat(self.path)
+        fd = os.open(self.idx_path, os.O_RDWR | os.O_CREAT | _O_BINARY, 0o644)
+        try:
+            if fcntl:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            raw = _leer_en(fd, _CAB.size, 0)
+            inode, inicio, hecho, total = _CAB.unpack(raw) if len(raw) == _CAB.size else (None, 0, 0, 0)
+            if inode != st.st_ino or st.st_size < hecho:
+                # Archivo nuevo, reemplazado (compactación) o truncado: se reconstruye
+                inicio, hecho, total = self._inicio_datos(), 0, 0
+                os.ftruncate(fd, _CAB.size)
+            if st.st_size > hecho:
+                nuevos = bytearray()
+                pos = max(hecho, inicio)
+                for fin, pos in self._fines(pos):
+                    if fin is not None:
+                        nuevos += _OFF.pack(fin)
+                if pos > hecho or nuevos:
+                    _escribir_en(fd, bytes(nuevos), _CAB.size + total * _OFF.size)
+                    total += len(nuevos) // _OFF.size
+                    hecho = pos
+            # La cabecera se escribe al final: un corte a medias deja offsets sobrantes que se ignoran
+            _escribir_en(fd, _CAB.pack(st.st_ino, inicio, hecho, total), 0)
+        finally:
+            os.close(fd)     # libera el flock
+        self.inicio, self.total = inicio, total
+        return total
+
+    # ---- lectura ----
+    def _offsets(self, i: int, j: int) -> List[int]:
+        """Límites de los registros [i, j): j-i+1 offsets (el primero es el inicio de i)."""
+        with open(self.idx_path, "rb") as f:
+            if i == 0:
+                f.seek(_CAB.size)
+                raw = f.read((j - i) * _OFF.size)
+                fines = [self.inicio]
+            else:
+                f.seek(_CAB.size + (i - 1) * _OFF.size)
+                raw = f.read((j - i + 1) * _OFF.size)
+                fines = []
+        return fines + [v for (v,) in _OFF.iter_unpack(raw)]
+
+    def registros(self, i: int, j: int) -> List[Any]:
+        """Registros [i, j) ya decodificados: str (txt), dict (csv/jsonl)."""
+        i, j = max(0, i), min(j, self.total)
+        if i >= j:
+            return []
+        limites = self._offsets(i, j)
+        with open(self.path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+            trozos = [m[a:b].decode("utf-8") for a, b in zip(limites, limites[1:])]
+        if self.modo == "txt":
+            return [t.rstrip("\r\n") for t in trozos]
+        if self.modo == "jsonl":
+            # Un trozo puede arrastrar líneas vacías o corruptas previas: el objeto es la última línea
+            return [json.loads(t.strip().splitlines()[-1]) for t in trozos]
+        with open(self.path, newline="", encoding="utf-8") as f:
+            campos = next(csv.reader([f.readline()]))
+        return [dict(zip(campos, fila)) for fila in csv.reader(io.StringIO("".join(trozos))) if fila]
+
+    def pagina(self, page: int, per_page: int) -> Tuple[List[Any], int]:
+        total = self.actualizar()
+        inicio = (page - 1) * per_page
+        return self.registros(inicio, inicio + per_page), total
+
+    def cola(self, k: int) -> Tuple[List[Any], int]:
+        total = self.actualizar()
+        return self.registros(total - k, total), total
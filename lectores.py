@@ -0,0 +1,147 @@
+# lectores.py
+# Lectura en streaming de los archivos de datos/ (TXT, CSV, JSON).
+# Todo son generadores: la memoria depende del registro/bloque actual,
+# no del tamaño del archivo.
+import csv
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterator, Tuple
+
+JSON_BLOCK = 64 * 1024   # caracteres leídos por bloque en el parser JSON
+_WS = " \t\r\n"
+
+
+def iter_lineas(path: Path) -> Iterator[str]:
+    """Líneas de un TXT sin el salto final, una a una."""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            yield line.rstrip("\r\n")
+
+
+def iter_csv(path: Path) -> Iterator[Dict[str, str]]:
+    """Filas de un CSV con cabecera como dicts (csv.DictReader incremental)."""
+    with open(path, newline="", encoding="utf-8") as f:
+        yield from csv.DictReader(f)
+
+
+def iter_json_array(path: Path, block: int = JSON_BLOCK) -> Iterator[Any]:
+    """
+    Elementos de un archivo cuyo nivel superior es un array JSON, decodificados
+    de uno en uno con JSONDecoder.raw_decode sobre un buffer acotado.
+    Si el documento no es un array no produce nada; si está mal formado lanza
+    json.JSONDecodeError.
+    """
+    decoder = json.JSONDecoder()
+    with open(path, encoding="utf-8") as f:
+        buf, pos, eof = "", 0, False
+
+        def more():
+            nonlocal buf, pos, eof
+            chunk = f.read(block)
+            if not chunk:
+                eof = True
+            buf = buf[pos:] + chunk
+            pos = 0
+
+        def skip_ws():
+            nonlocal pos
+            while True:
+                while pos < len(buf) and buf[pos] in _WS:
+                    pos += 1
+                if pos < len(buf) or eof:
+                    return
+                more()
+
+        skip_ws()
+        if pos >= len(buf) or buf[pos] != "[":
+            return
+        pos += 1
+        first = True
+        while True:
+            skip_ws()
+            if pos >= len(buf):
+                raise json.JSONDecodeError("Array sin cerrar", buf, pos)
+            if buf[pos] == "]":
+                return
+            if not first:
+                if buf[pos] != ",":
+                    raise json.JSONDecodeError("Se esperaba ','", buf, pos)
+                pos += 1
+                skip_ws()
+            while True:
+                try:
+                    obj, end = decoder.raw_decode(buf, pos)
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                    more()
+                    continue
+                # Un valor que toca el final del buffer puede seguir en el próximo bloque (p. ej. números)
+                if end == len(buf) and not eof:
+                    more()
+                    continue
+                break
+            pos = end
+            first = False
+            yield obj
+
+
+# ---- Lectura reanudable (importación incremental) ----
+def _lineas_binarias(f, offset: int) -> Iterator[Tuple[str, int]]:
+    """(línea decodificada, offset tras la línea). Una última línea sin '\\n' se deja para la próxima vez."""
+    f.seek(offset)
+    pos = offset
+    for raw in f:
+        if not raw.endswith(b"\n"):
+            return
+        pos += len(raw)
+        yield raw.decode("utf-8"), pos
+
+
+def iter_lineas_desde(path: Path, offset: int = 0) -> Iterator[Tuple[str, int]]:
+    """Como iter_lineas pero desde un offset en bytes; cada línea va con el offset donde termina."""
+    with open(path, "rb") as f:
+        for line, fin in _lineas_binarias(f, offset):
+            yield line.rstrip("\r\n"), fin
+
+
+def iter_csv_desde(path: Path, offset: int = 0) -> Iterator[Tuple[Dict[str, str], int]]:
+    """
+    Filas de un CSV con cabecera desde un offset en bytes (0 = inicio).
+    Cada fila va con el offset donde termina; la cabecera se lee siempre del principio.
+    """
+    with open(path, "rb") as f:
+        header = f.readline()
+        if not header.endswith(b"\n"):
+            return
+        fieldnames = next(csv.reader([header.decode("utf-8")]))
+        fin = max(offset, len(header))
+        posiciones = _lineas_binarias(f, fin)
+
+        def lineas():
+            nonlocal fin
+            for line, fin in posiciones:
+                yield line
+
+        for row in csv.reader(lineas()):
+            if not row:
+                continue
+            yield dict(zip(fieldnames, row)), fin
+
+
+def iter_jsonl(path: Path) -> Iterator[Any]:
+    """Objetos de un archivo JSON Lines; las líneas vacías o corruptas se saltan."""
+    for obj, _ in iter_jsonl_desde(path):
+        if obj is not None:
+            yield obj
+
+
+def iter_jsonl_desde(path: Path, offset: int = 0) -> Iterator[Tuple[Any, int]]:
+    """(objeto o None si la línea no es JSON válido, offset donde termina la línea)."""
+    for line, fin in iter_lineas_desde(path, offset):
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line), fin
+        except json.JSONDecodeError:
+            yield None, fin
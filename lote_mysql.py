@@ -0,0 +1,199 @@
+# lote_mysql.py
+# Altas / cambios / bajas por lotes sobre las tablas MySQL (productos,
+# categorías) en UNA transacción:
+#   - altas:   INSERT multi-fila; lastrowid es la clave de la primera fila y
+#              las demás van de @@auto_increment_increment en
+#              @@auto_increment_increment (Galera/réplicas multi-maestro lo
+#              suben de 1). Con innodb_autoinc_lock_mode=2 (intercalado) las
+#              claves de una misma sentencia pueden no ser seguidas: entonces
+#              se inserta fila a fila y se lee lastrowid de cada una.
+#   - cambios: SELECT ... FOR UPDATE de los ids afectados, mezcla en memoria y
+#              INSERT multi-fila ... ON DUPLICATE KEY UPDATE (las filas ya
+#              existen y están bloqueadas: es un UPDATE masivo en un viaje)
+#   - bajas:   DELETE ... WHERE clave IN (...)
+# Cada elemento recibe su resultado; los inválidos se saltan sin abortar el
+# resto. Un error de la base de datos deshace el lote entero.
+import math
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Tuple
+
+FILAS_POR_SENTENCIA = 1000
+
+
+def _nombre(max_len: int) -> Callable[[Any], str]:
+    def v(x):
+        x = str(x or "").strip()
+        if not 2 <= len(x) <= max_len:
+            raise ValueError(f"nombre debe tener entre 2 y {max_len} caracteres")
+        return x
+    return v
+
+
+def _precio(x) -> float:
+    x = float(x)
+    if not math.isfinite(x) or x < 0:
+        raise ValueError("precio no puede ser negativo")
+    return round(x, 2)
+
+
+def _stock(x) -> int:
+    if isinstance(x, bool) or int(x) != float(x):
+        raise ValueError("stock debe ser entero")
+    if int(x) < 0:
+        raise ValueError("stock no puede ser negativo")
+    return int(x)
+
+
+@dataclass(frozen=True)
+class TablaLote:
+    tabla: str
+    clave: str
+    campos: Dict[str, Callable[[Any], Any]]    # columna -> validador/normalizador (mismas reglas que los formularios)
+
+    @property
+    def columnas(self) -> List[str]:
+        return list(self.campos)
+
+
+TABLAS = {
+    "productos":  TablaLote("productos", "id_producto",
+                            {"nombre": _nombre(100), "precio": _precio, "stock": _stock}),
+    "categorias": TablaLote("categorias", "id_categoria", {"nombre": _nombre(80)}),
+}
+
+
+def _trozos(seq, n=FILAS_POR_SENTENCIA):
+    for i in range(0, len(seq), n):
+        yield seq[i:i + n]
+
+
+def _autoincremento(cur) -> Tuple[int, int]:
+    """(@@auto_increment_increment, @@innodb_autoinc_lock_mode) de la sesión."""
+    cur.execute("SELECT @@auto_increment_increment, @@innodb_autoinc_lock_mode")
+    paso, modo = cur.fetchone()
+    return int(paso or 1), int(modo if modo is not None else 1)
+
+
+def _id(x) -> int:
+    try:
+        ok = not isinstance(x, bool) and int(x) == float(x) and int(x) > 0
+    except (TypeError, ValueError, OverflowError):
+        ok = False
+    if not ok:
+        raise ValueError("id inválido")
+    return int(x)
+
+
+def _validar(spec: TablaLote, item, parcial: bool) -> Dict[str, Any]:
+    if not isinstance(item, dict):
+        raise ValueError("se esperaba un objeto")
+    desconocidos = set(item) - set(spec.campos) - {spec.clave}
+    if desconocidos:
+        raise ValueError(f"campos desconocidos: {', '.join(sorted(desconocidos))}")
+    faltan = [c for c in spec.columnas if c not in item]
+    if faltan and not parcial:
+        raise ValueError(f"faltan campos: {', '.join(faltan)}")
+    datos = {}
+    for c, validar in spec.campos.items():
+        if c in item:
+            try:
+                datos[c] = validar(item[c])
+            except (TypeError, ValueError, OverflowError) as e:
+                raise ValueError(f"{c}: {e}") from None
+    if parcial and not datos:
+        raise ValueError("nada que actualizar")
+    return datos
+
+
+def aplicar_lote(conn, spec: TablaLote, crear: list, actualizar: list, eliminar: list) -> Dict[str, Any]:
+    """
+    Aplica el lote con `conn` (sin autocommit) y hace commit; ante un error de
+    la base de datos hace rollback y relanza. Devuelve resultados por elemento
+    en el mismo orden de entrada: {"ok": True, "id": n} o {"ok": False, "error": "..."}.
+    """
+    res = {"crear": [None] * len(crear), "actualizar": [None] * len(actualizar),
+           "eliminar": [None] * len(eliminar)}
+
+    altas: List[Tuple[int, Dict[str, Any]]] = []
+    for i, item in enumerate(crear):
+        try:
+            altas.append((i, _validar(spec, item, parcial=False)))
+        except ValueError as e:
+            res["crear"][i] = {"ok": False, "error": str(e)}
+
+    cambios: List[Tuple[int, int, Dict[str, Any]]] = []
+    for i, item in enumerate(actualizar):
+        try:
+            if not isinstance(item, dict):
+                raise ValueError("se esperaba un objeto")
+            cambios.append((i, _id(item.get(spec.clave)), _validar(spec, item, parcial=True)))
+        except ValueError as e:
+            res["actualizar"][i] = {"ok": False, "error": str(e)}
+
+    bajas: List[Tuple[int, int]] = []
+    for i, item in enumerate(eliminar):
+        try:
+            bajas.append((i, _id(item.get(spec.clave) if isinstance(item, dict) else item)))
+        except ValueError as e:
+            res["eliminar"][i] = {"ok": False, "error": str(e)}
+
+    cols = spec.columnas
+    cur = conn.cursor()
+    try:
+        # Bloquear y leer de una vez las filas que se van a tocar (en orden de clave)
+        ids = sorted({pid for _, pid, _ in cambios} | {pid for _, pid in bajas})
+        actuales: Dict[int, Dict[str, Any]] = {}
+        for trozo in _trozos(ids):
+            cur.execute(f"SELECT {spec.clave}, {', '.join(cols)} FROM {spec.tabla} "
+                        f"WHERE {spec.clave} IN ({', '.join(['%s'] * len(trozo))}) "
+                        f"ORDER BY {spec.clave} FOR UPDATE", trozo)
+            for fila in cur.fetchall():
+                actuales[fila[0]] = dict(zip(cols, fila[1:]))
+
+        # Cambios: varios sobre el mismo id se aplican en orden sobre la misma fila
+        tocados = {}
+        for i, pid, datos in cambios:
+            if pid not in actuales:
+                res["actualizar"][i] = {"ok": False, "error": "no existe"}
+                continue
+            actuales[pid].update(datos)
+            tocados[pid] = actuales[pid]
+            res["actualizar"][i] = {"ok": True, "id": pid}
+        filas = [(pid, *(fila[c] for c in cols)) for pid, fila in sorted(tocados.items())]
+        upsert = ", ".join(f"{c}=VALUES({c})" for c in cols)
+        fila_sql = f"({', '.join(['%s'] * (len(cols) + 1))})"
+        for trozo in _trozos(filas):
+            cur.execute(f"INSERT INTO {spec.tabla} ({spec.clave}, {', '.join(cols)}) "
+                        f"VALUES {', '.join([fila_sql] * len(trozo))} ON DUPLICATE KEY UPDATE {upsert}",
+                        [v for f in trozo for v in f])
+
+        borrados = set()
+        for i, pid in bajas:
+            if pid not in actuales or pid in borrados:
+                res["eliminar"][i] = {"ok": False, "error": "repetido en el lote" if pid in borrados else "no existe"}
+                continue
+            borrados.add(pid)
+            res["eliminar"][i] = {"ok": True, "id": pid}
+        for trozo in _trozos(sorted(borrados)):
+            cur.execute(f"DELETE FROM {spec.tabla} WHERE {spec.clave} IN ({', '.join(['%s'] * len(trozo))})",
+                        trozo)
+
+        if altas:
+            paso, modo = _autoincremento(cur)
+            fila_sql = f"({', '.join(['%s'] * len(cols))})"
+            for trozo in _trozos(altas, FILAS_POR_SENTENCIA if modo != 2 else 1):
+                cur.execute(f"INSERT INTO {spec.tabla} ({', '.join(cols)}) VALUES {', '.join([fila_sql] * len(trozo))}",
+                            [d[c] for _, d in trozo for c in cols])
+                for n, (i, _) in enumerate(trozo):
+                    res["crear"][i] = {"ok": True, "id": cur.lastrowid + n * paso}
+
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+
+    res["resumen"] = {k: {"ok": sum(1 for r in v if r["ok"]), "error": sum(1 for r in v if not r["ok"])}
+                      for k, v in res.items()}
+    return res
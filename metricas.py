@@ -0,0 +1,149 @@
+# metricas.py
+# Contadores e histogramas de latencia en memoria del proceso, expuestos en
+# formato de texto de Prometheus (/metrics). Cada worker publica los suyos;
+# Prometheus los distingue por instancia y se suman al consultar.
+#
+# También el registro de consultas lentas: SQL normalizado, huella de los
+# parámetros (hash, nunca los valores) y duración, en el logger "consultas_lentas".
+import hashlib
+import logging
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, Optional, Tuple
+
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+log_lentas = logging.getLogger("consultas_lentas")
+
+Etiquetas = Tuple[Tuple[str, str], ...]
+
+
+class Histograma:
+    __slots__ = ("cuentas", "suma", "n")
+
+    def __init__(self):
+        self.cuentas = [0] * len(BUCKETS)
+        self.suma = 0.0
+        self.n = 0
+
+    def observar(self, v: float) -> None:
+        for i, b in enumerate(BUCKETS):
+            if v <= b:
+                self.cuentas[i] += 1
+                break
+        self.suma += v
+        self.n += 1
+
+
+class Registro:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._hist: Dict[str, Dict[Etiquetas, Histograma]] = {}
+        self._cont: Dict[str, Dict[Etiquetas, float]] = {}
+        self._ayuda: Dict[str, str] = {}
+        self.umbral_lento: Optional[float] = 0.2      # segundos; None desactiva el registro de lentas
+
+    def describir(self, nombre: str, ayuda: str) -> None:
+        self._ayuda[nombre] = ayuda
+
+    def observar(self, nombre: str, valor: float, **etiquetas) -> None:
+        clave = tuple(sorted(etiquetas.items()))
+        with self._lock:
+            serie = self._hist.setdefault(nombre, {})
+            h = serie.get(clave)
+            if h is None:
+                h = serie[clave] = Histograma()
+            h.observar(valor)
+
+    def contar(self, nombre: str, n: float = 1, **etiquetas) -> None:
+        clave = tuple(sorted(etiquetas.items()))
+        with self._lock:
+            serie = self._cont.setdefault(nombre, {})
+            serie[clave] = serie.get(clave, 0) + n
+
+    # -------- consultas --------
+    def consulta(self, origen: str, sql: str, params, segundos: float) -> None:
+        self.observar("db_query_duration_seconds", segundos, origen=origen, op=_operacion(sql))
+        if self.umbral_lento is not None and segundos >= self.umbral_lento:
+            self.contar("db_slow_queries_total", origen=origen)
+            log_lentas.warning("consulta lenta origen=%s ms=%.1f params=%s sql=%s",
+                               origen, segundos * 1000, huella(params), normalizar(sql))
+
+    @contextmanager
+    def cronometro(self, origen: str, sql: str, params=()):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.consulta(origen, sql, params, time.perf_counter() - t0)
+
+    # -------- exposición --------
+    def exponer(self) -> str:
+        lineas = []
+        with self._lock:
+            for nombre in sorted(self._cont):
+                lineas += self._cabecera(nombre, "counter")
+                for clave, v in sorted(self._cont[nombre].items()):
+                    lineas.append(f"{nombre}{_fmt(clave)} {_num(v)}")
+            for nombre in sorted(self._hist):
+                lineas += self._cabecera(nombre, "histogram")
+                for clave, h in sorted(self._hist[nombre].items()):
+                    acumulado = 0
+                    for b, c in zip(BUCKETS, h.cuentas):
+                        acumulado += c
+                        lineas.append(f"{nombre}_bucket{_fmt(clave + (('le', _num(b)),))} {acumulado}")
+                    lineas.append(f"{nombre}_bucket{_fmt(clave + (('le', '+Inf'),))} {h.n}")
+                    lineas.append(f"{nombre}_sum{_fmt(clave)} {_num(h.suma)}")
+                    lineas.append(f"{nombre}_count{_fmt(clave)} {h.n}")
+        return "\n".join(lineas) + "\n"
+
+    def _cabecera(self, nombre: str, tipo: str) -> Iterable[str]:
+        if nombre in self._ayuda:
+            yield f"# HELP {nombre} {self._ayuda[nombre]}"
+        yield f"# TYPE {nombre} {tipo}"
+
+    def reiniciar(self) -> None:
+        with self._lock:
+            self._hist.clear()
+            self._cont.clear()
+
+
+_ESPACIOS = re.compile(r"\s+")
+
+
+def normalizar(sql: str, max_len: int = 500) -> str:
+    sql = _ESPACIOS.sub(" ", sql).strip()
+    return sql if len(sql) <= max_len else sql[:max_len] + "…"
+
+
+def huella(params) -> str:
+    """Identifica un juego de parámetros sin registrar sus valores."""
+    return hashlib.sha1(repr(params).encode("utf-8", "replace")).hexdigest()[:12] if params else "-"
+
+
+def _operacion(sql: str) -> str:
+    palabra = sql.lstrip().split(None, 1)
+    return palabra[0].upper() if palabra else "?"
+
+
+def _escapar(v: str) -> str:
+    return str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _fmt(clave: Etiquetas) -> str:
+    return "{" + ",".join(f'{k}="{_escapar(v)}"' for k, v in clave) + "}" if clave else ""
+
+
+def _num(v: float) -> str:
+    v = float(v)
+    return str(int(v)) if v.is_integer() else repr(v)
+
+
+metricas = Registro()
+metricas.describir("http_request_duration_seconds", "Duración de las peticiones por endpoint.")
+metricas.describir("http_requests_total", "Peticiones atendidas por endpoint, método y estado.")
+metricas.describir("template_render_duration_seconds", "Tiempo de render de plantillas Jinja.")
+metricas.describir("db_query_duration_seconds", "Duración de las consultas por origen y operación.")
+metricas.describir("db_slow_queries_total", "Consultas por encima del umbral de lentas.")
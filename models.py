@@ -1,9 +1,14 @@
 # models.py
 # Capa de acceso de usuarios para Flask-Login usando MySQL (XAMPP)
+import os
 from typing import Optional, Dict, Any
-from werkzeug.security import generate_password_hash
-from Conexion import get_db_connection
+from Conexion import borrow_connection
 from flask_login import UserMixin
+from cache_usuarios import UserCache, SharedUserCache
+from versiones import versiones, tablas_escritas
+from metricas import metricas
+from hash_claves import hash_claves
+from asincrono import en_hilo
 
 # ---- Objeto de sesión para Flask-Login ----
 class User(UserMixin):
@@ -14,25 +19,55 @@ class User(UserMixin):
 
 # ---- Helpers a MySQL ----
 def _fetch_one(sql: str, params=()) -> Optional[Dict[str, Any]]:
-    conn = get_db_connection()
-    cur = conn.cursor(dictionary=True)
-    cur.execute(sql, params)
-    row = cur.fetchone()
-    cur.close(); conn.close()
+    with borrow_connection() as conn:
+        cur = conn.cursor(dictionary=True)
+        with metricas.cronometro("mysql", sql, params):
+            cur.execute(sql, params)
+            row = cur.fetchone()
+        cur.close()
     return row
 
-def _execute(sql: str, params=()) -> None:
-    conn = get_db_connection()
-    cur = conn.cursor()
-    cur.execute(sql, params)
-    conn.commit()
-    cur.close(); conn.close()
+def _execute(sql: str, params=()) -> Optional[int]:
+    """Ejecuta y confirma; devuelve el lastrowid (útil tras un INSERT)."""
+    with borrow_connection() as conn:
+        cur = conn.cursor()
+        with metricas.cronometro("mysql", sql, params):
+            cur.execute(sql, params)
+            conn.commit()
+        rowid = cur.lastrowid
+        cur.close()
+    versiones.bump(tablas_escritas(sql))
+    return rowid
+
+# ---- Caché de usuarios para el user_loader ----
+# USER_CACHE_FILE=/ruta/cache.db comparte la caché entre workers (SQLite);
+# sin ella, cada proceso tiene su propia caché en memoria.
+USER_CACHE_SIZE = int(os.environ.get("USER_CACHE_SIZE", 1024))
+USER_CACHE_TTL  = float(os.environ.get("USER_CACHE_TTL", 300))
+if os.environ.get("USER_CACHE_FILE"):
+    user_cache = SharedUserCache(os.environ["USER_CACHE_FILE"], lambda uid, nombre, email: User(uid, nombre, email),
+                                 USER_CACHE_SIZE, USER_CACHE_TTL)
+else:
+    user_cache = UserCache(USER_CACHE_SIZE, USER_CACHE_TTL)
+
+def invalidar_usuario(user_id: int) -> None:
+    """Llamar tras modificar o borrar un usuario para que el loader no sirva datos viejos."""
+    user_cache.invalidate(int(user_id))
 
 # ---- API pública usada por app.py ----
 def get_user_by_id(user_id: int) -> Optional[User]:
     row = _fetch_one("SELECT id, nombre, email FROM usuarios WHERE id=%s", (user_id,))
     return User(row["id"], row["nombre"], row["email"]) if row else None
 
+def get_user_cached(user_id: int) -> Optional[User]:
+    """get_user_by_id pasando por la caché (los usuarios inexistentes no se cachean)."""
+    user = user_cache.get(user_id)
+    if user is None:
+        user = get_user_by_id(user_id)
+        if user is not None:
+            user_cache.put(user_id, user)
+    return user
+
 def get_user_by_email(email: str) -> Optional[Dict[str, Any]]:
     """Devuelve dict con id, nombre, email, password_hash o None."""
     return _fetch_one(
@@ -40,9 +75,21 @@ def get_user_by_email(email: str) -> Optional[Dict[str, Any]]:
         (email,)
     )
 
+# Versiones awaitables para vistas async: sueltan la conexión de la petición
+# y consultan con una propia del pool (ver asincrono.en_hilo)
+aget_user_by_id = en_hilo(get_user_by_id)
+aget_user_by_email = en_hilo(get_user_by_email)
+
 def create_user(nombre: str, email: str, password: str) -> None:
-    password_hash = generate_password_hash(password)
-    _execute(
+    """El hash se calcula en el pool de hash_claves (puede lanzar hash_claves.Saturado)."""
+    password_hash = hash_claves.generar(password)
+    uid = _execute(
         "INSERT INTO usuarios (nombre, email, password_hash) VALUES (%s, %s, %s)",
         (nombre, email, password_hash),
     )
+    if uid:
+        invalidar_usuario(uid)
+
+def update_password_hash(user_id: int, password_hash: str) -> None:
+    """Sustituye el hash (rehash tras cambiar PASSWORD_HASH_METODO); no cambia nada visible del usuario."""
+    _execute("UPDATE usuarios SET password_hash=%s WHERE id=%s", (password_hash, user_id))
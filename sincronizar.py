@@ -0,0 +1,357 @@
+# sincronizar.py
+# Sincronización incremental entre los dos catálogos de productos:
+#   SQLite productos(id, nombre, cantidad, precio)  <->  MySQL productos(id_producto, nombre, precio, stock)
+# La identidad común es `nombre`; cantidad <-> stock, precio <-> precio.
+#
+# Cada lado tiene un registro de cambios `sync_cambios(seq, nombre, ts)` que
+# llenan triggers sobre productos (cualquier escritor queda registrado, también
+# el importador o un cliente externo). Una pasada lee lotes de ambos registros
+# desde el último seq consumido, lleva el estado actual de cada nombre tocado
+# al otro lado y avanza los cursores; el coste depende de lo que cambió.
+#
+# Conflicto (mismo nombre con cambios pendientes en los dos lados): gana
+# `ganador` — "reciente" (mayor ts; empate -> MySQL), "mysql" o "sqlite".
+# Los ts de SQLite son del reloj de la app y los de MySQL del servidor.
+#
+# Las escrituras de la propia sincronización no se registran (MySQL: variable
+# de sesión @sync_silencio que miran los triggers; SQLite: se borran en la
+# misma transacción IMMEDIATE), así no rebotan al otro lado.
+import json
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+
+LOTE = 500
+
+SQLITE_DDL = """
+CREATE TABLE IF NOT EXISTS sync_cambios(
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    nombre TEXT NOT NULL,
+    ts REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_sync_cambios_nombre ON sync_cambios(nombre, seq);
+CREATE TABLE IF NOT EXISTS sync_estado(
+    clave TEXT PRIMARY KEY,
+    valor TEXT NOT NULL
+);
+CREATE TRIGGER IF NOT EXISTS productos_sync_ai AFTER INSERT ON productos BEGIN
+    INSERT INTO sync_cambios(nombre, ts) VALUES (new.nombre, (julianday('now') - 2440587.5) * 86400.0);
+END;
+CREATE TRIGGER IF NOT EXISTS productos_sync_ad AFTER DELETE ON productos BEGIN
+    INSERT INTO sync_cambios(nombre, ts) VALUES (old.nombre, (julianday('now') - 2440587.5) * 86400.0);
+END;
+CREATE TRIGGER IF NOT EXISTS productos_sync_au AFTER UPDATE OF nombre, cantidad, precio ON productos BEGIN
+    INSERT INTO sync_cambios(nombre, ts) VALUES (old.nombre, (julianday('now') - 2440587.5) * 86400.0);
+    INSERT INTO sync_cambios(nombre, ts)
+        SELECT new.nombre, (julianday('now') - 2440587.5) * 86400.0 WHERE new.nombre <> old.nombre;
+END;
+"""
+
+MYSQL_DDL = """
+CREATE TABLE IF NOT EXISTS sync_cambios (
+    seq BIGINT NOT NULL AUTO_INCREMENT PRIMARY KEY,
+    nombre VARCHAR(100) NOT NULL,
+    ts DOUBLE NOT NULL,
+    KEY ix_sync_cambios_nombre (nombre, seq)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+"""
+
+MYSQL_TRIGGERS = {
+    "productos_sync_ai": """
+CREATE TRIGGER productos_sync_ai AFTER INSERT ON productos FOR EACH ROW
+BEGIN
+    IF @sync_silencio IS NULL THEN
+        INSERT INTO sync_cambios(nombre, ts) VALUES (NEW.nombre, UNIX_TIMESTAMP(NOW(6)));
+    END IF;
+END""",
+    "productos_sync_ad": """
+CREATE TRIGGER productos_sync_ad AFTER DELETE ON productos FOR EACH ROW
+BEGIN
+    IF @sync_silencio IS NULL THEN
+        INSERT INTO sync_cambios(nombre, ts) VALUES (OLD.nombre, UNIX_TIMESTAMP(NOW(6)));
+    END IF;
+END""",
+    "productos_sync_au": """
+CREATE TRIGGER productos_sync_au AFTER UPDATE ON productos FOR EACH ROW
+BEGIN
+    IF @sync_silencio IS NULL THEN
+        INSERT INTO sync_cambios(nombre, ts) VALUES (OLD.nombre, UNIX_TIMESTAMP(NOW(6)));
+        IF NEW.nombre <> OLD.nombre THEN
+            INSERT INTO sync_cambios(nombre, ts) VALUES (NEW.nombre, UNIX_TIMESTAMP(NOW(6)));
+        END IF;
+    END IF;
+END""",
+}
+
+GANADORES = ("reciente", "mysql", "sqlite")
+
+
+def _marcas(n: int, m: str = "%s") -> str:
+    return ", ".join([m] * n)
+
+
+def _igual(a, b) -> bool:
+    """Filas normalizadas (cantidad, precio); None = no existe."""
+    if a is None or b is None:
+        return a is b
+    return int(a[0]) == int(b[0]) and round(float(a[1]), 2) == round(float(b[1]), 2)
+
+
+class SincronizadorProductos:
+    """
+    Uso:
+        s = SincronizadorProductos(get_conn, get_db_connection)
+        s.instalar()                       # DDL + triggers (idempotente)
+        stats = s.sincronizar(progreso=print)
+    `completo=True` reconcilia además todo el catálogo (primera vez o tras
+    cambios hechos con los triggers desactivados).
+    """
+
+    def __init__(self, get_sqlite: Callable, get_mysql: Callable, lote: int = LOTE, ganador: str = "reciente"):
+        if ganador not in GANADORES:
+            raise ValueError(f"ganador debe ser uno de {GANADORES}")
+        self.get_sqlite = get_sqlite
+        self.get_mysql = get_mysql
+        self.lote = max(1, int(lote))
+        self.ganador = ganador
+
+    # -------- instalación y estado --------
+    def instalar(self) -> bool:
+        """Crea registros y triggers; devuelve True si era la primera vez (hace falta pasada completa)."""
+        s = self.get_sqlite()
+        nuevo = s.execute("SELECT 1 FROM sqlite_master WHERE name='sync_estado'").fetchone() is None
+        s.executescript(SQLITE_DDL)
+        m = self.get_mysql()
+        try:
+            cur = m.cursor()
+            cur.execute(MYSQL_DDL)
+            cur.execute("SELECT TRIGGER_NAME FROM information_schema.TRIGGERS "
+                        "WHERE TRIGGER_SCHEMA = DATABASE() AND EVENT_OBJECT_TABLE = 'productos'")
+            existentes = {r[0] for r in cur.fetchall()}
+            for nombre, ddl in MYSQL_TRIGGERS.items():
+                if nombre not in existentes:
+                    cur.execute(ddl)
+            cur.close()
+        finally:
+            m.close()
+        return nuevo
+
+    def _estado(self, clave: str, defecto=None):
+        row = self.get_sqlite().execute("SELECT valor FROM sync_estado WHERE clave=?", (clave,)).fetchone()
+        return json.loads(row[0]) if row else defecto
+
+    @staticmethod
+    def _guardar(s, clave: str, valor) -> None:
+        s.execute("INSERT INTO sync_estado(clave, valor) VALUES (?, ?) "
+                  "ON CONFLICT(clave) DO UPDATE SET valor=excluded.valor", (clave, json.dumps(valor)))
+
+    def pendientes(self) -> Dict[str, int]:
+        cursores = self._estado("cursores", {"sqlite": 0, "mysql": 0})
+        n_s = self.get_sqlite().execute("SELECT COUNT(*) FROM sync_cambios WHERE seq > ?",
+                                        (cursores["sqlite"],)).fetchone()[0]
+        m = self.get_mysql()
+        try:
+            cur = m.cursor()
+            cur.execute("SELECT COUNT(*) FROM sync_cambios WHERE seq > %s", (cursores["mysql"],))
+            n_m = cur.fetchone()[0]
+            cur.close()
+        finally:
+            m.close()
+        return {"sqlite": n_s, "mysql": n_m}
+
+    def estado(self) -> Dict:
+        return {"cursores": self._estado("cursores", {"sqlite": 0, "mysql": 0}),
+                "pendientes": self.pendientes(), "ultima": self._estado("ultima")}
+
+    # -------- lectura --------
+    def _filas_sqlite(self, nombres: List[str]) -> Dict[str, tuple]:
+        rows = self.get_sqlite().execute(
+            f"SELECT nombre, cantidad, precio FROM productos WHERE nombre IN ({_marcas(len(nombres), '?')})",
+            nombres).fetchall()
+        return {r[0]: (r[1], r[2]) for r in rows}
+
+    @staticmethod
+    def _filas_mysql(cur, nombres: List[str]) -> Dict[str, tuple]:
+        """{nombre: (stock, precio, id_producto)} bloqueadas; con nombres repetidos manda el id más bajo."""
+        cur.execute(f"SELECT id_producto, nombre, precio, stock FROM productos WHERE nombre IN "
+                    f"({_marcas(len(nombres))}) ORDER BY id_producto FOR UPDATE", nombres)
+        filas = {}
+        for pid, nombre, precio, stock in cur.fetchall():
+            filas.setdefault(nombre, (stock, precio, pid))
+        return filas
+
+    # -------- decisión --------
+    def _gana_sqlite(self, ts_s: Optional[float], ts_m: Optional[float]) -> bool:
+        if ts_m is None:
+            return True
+        if ts_s is None:
+            return False
+        if self.ganador == "reciente":
+            return ts_s > ts_m
+        return self.ganador == "sqlite"
+
+    def _aplicar(self, nombres: List[str], ts_s: Optional[Dict[str, float]], ts_m: Optional[Dict[str, float]],
+                 cursores: Dict[str, int], consumido: Dict[str, int], stats: Dict) -> None:
+        """
+        Lleva cada nombre al estado del lado ganador y avanza los cursores hasta
+        `consumido`. ts_s/ts_m = None (pasada completa): cuenta como cambiado
+        el lado donde la fila existe.
+        """
+        s = self.get_sqlite()
+        m = self.get_mysql()
+        try:
+            cur = m.cursor()
+            cur.execute("SET @sync_silencio = 1")
+            filas_s = self._filas_sqlite(nombres)
+            filas_m = self._filas_mysql(cur, nombres)
+            if ts_s is None:
+                ts_s = dict.fromkeys(filas_s, 0.0)
+                ts_m = dict.fromkeys(filas_m, 0.0)
+
+            a_sqlite, a_mysql = [], []      # (nombre, (cantidad, precio) o None si hay que borrar)
+            for n in nombres:
+                fs = filas_s.get(n)
+                fm = (filas_m[n][0], filas_m[n][1]) if n in filas_m else None
+                if _igual(fs, fm):
+                    continue
+                if n in ts_s and n in ts_m:
+                    stats["conflictos"] += 1
+                if self._gana_sqlite(ts_s.get(n), ts_m.get(n)):
+                    a_mysql.append((n, fs))
+                else:
+                    a_sqlite.append((n, fm))
+
+            # MySQL: bajas, cambios por clave y altas multi-fila
+            borrar = [n for n, f in a_mysql if f is None]
+            if borrar:
+                cur.execute(f"DELETE FROM productos WHERE nombre IN ({_marcas(len(borrar))})", borrar)
+            cambios = [(f[1], f[0], filas_m[n][2]) for n, f in a_mysql if f is not None and n in filas_m]
+            if cambios:
+                cur.executemany("UPDATE productos SET precio=%s, stock=%s WHERE id_producto=%s", cambios)
+            altas = [(n, f[1], f[0]) for n, f in a_mysql if f is not None and n not in filas_m]
+            if altas:
+                cur.execute(f"INSERT INTO productos (nombre, precio, stock) VALUES "
+                            f"{_marcas(len(altas), '(%s, %s, %s)')}", [v for a in altas for v in a])
+            # Del registro MySQL solo se purga lo que ya cubre un cursor guardado en SQLite
+            cur.execute("DELETE FROM sync_cambios WHERE seq <= %s", (cursores["mysql"],))
+            m.commit()
+            cur.close()
+        except Exception:
+            m.rollback()
+            raise
+        finally:
+            # La conexión vuelve al pool: sin esto sus escrituras futuras no se registrarían
+            try:
+                c = m.cursor(); c.execute("SET @sync_silencio = NULL"); c.close()
+            except Exception:
+                pass
+            m.close()
+
+        # SQLite: en una transacción IMMEDIATE (escritor único) los cambios registrados tras `antes` son nuestros
+        s.execute("BEGIN IMMEDIATE")
+        try:
+            antes = s.execute("SELECT COALESCE(MAX(seq), 0) FROM sync_cambios").fetchone()[0]
+            # Lo que alguien tocó en SQLite desde la lectura no se pisa: su cambio registrado se verá en la próxima pasada
+            ahora = self._filas_sqlite([n for n, _ in a_sqlite]) if a_sqlite else {}
+            a_sqlite = [(n, f) for n, f in a_sqlite if _igual(ahora.get(n), filas_s.get(n))]
+            borrar = [n for n, f in a_sqlite if f is None]
+            if borrar:
+                s.execute(f"DELETE FROM productos WHERE nombre IN ({_marcas(len(borrar), '?')})", borrar)
+            s.executemany("INSERT INTO productos(nombre, cantidad, precio) VALUES (?, ?, ?) "
+                          "ON CONFLICT(nombre) DO UPDATE SET cantidad=excluded.cantidad, precio=excluded.precio",
+                          [(n, int(f[0]), float(f[1])) for n, f in a_sqlite if f is not None])
+            s.execute("DELETE FROM sync_cambios WHERE seq > ? OR seq <= ?", (antes, consumido["sqlite"]))
+            cursores.update(consumido)
+            self._guardar(s, "cursores", cursores)
+            s.commit()
+        except Exception:
+            s.rollback()
+            raise
+
+        stats["a_mysql"] += len(a_mysql)
+        stats["a_sqlite"] += len(a_sqlite)
+        stats["nombres"] += len(nombres)
+
+    # -------- pasadas --------
+    def _cambios_sqlite(self, desde: int) -> list:
+        return self.get_sqlite().execute(
+            "SELECT seq, nombre FROM sync_cambios WHERE seq > ? ORDER BY seq LIMIT ?", (desde, self.lote)
+        ).fetchall()
+
+    def _cambios_mysql(self, desde: int) -> list:
+        m = self.get_mysql()
+        try:
+            cur = m.cursor()
+            cur.execute("SELECT seq, nombre FROM sync_cambios WHERE seq > %s ORDER BY seq LIMIT %s",
+                        (desde, self.lote))
+            rows = cur.fetchall()
+            cur.close()
+        finally:
+            m.close()
+        return rows
+
+    def _ts_pendientes(self, nombres: List[str], cursores: Dict[str, int]):
+        """Mayor ts pendiente por nombre en cada lado (aunque caiga fuera de este lote)."""
+        ts_s = {r[0]: r[1] for r in self.get_sqlite().execute(
+            f"SELECT nombre, MAX(ts) FROM sync_cambios WHERE seq > ? AND nombre IN "
+            f"({_marcas(len(nombres), '?')}) GROUP BY nombre", [cursores["sqlite"], *nombres])}
+        m = self.get_mysql()
+        try:
+            cur = m.cursor()
+            cur.execute(f"SELECT nombre, MAX(ts) FROM sync_cambios WHERE seq > %s AND nombre IN "
+                        f"({_marcas(len(nombres))}) GROUP BY nombre", [cursores["mysql"], *nombres])
+            ts_m = {r[0]: r[1] for r in cur.fetchall()}
+            cur.close()
+        finally:
+            m.close()
+        return ts_s, ts_m
+
+    def _todos_los_nombres(self) -> Iterable[List[str]]:
+        nombres = {r[0] for r in self.get_sqlite().execute("SELECT nombre FROM productos")}
+        m = self.get_mysql()
+        try:
+            cur = m.cursor()
+            cur.execute("SELECT DISTINCT nombre FROM productos")
+            nombres.update(r[0] for r in cur.fetchall())
+            cur.close()
+        finally:
+            m.close()
+        nombres = sorted(nombres)
+        for i in range(0, len(nombres), self.lote):
+            yield nombres[i:i + self.lote]
+
+    def sincronizar(self, completo: bool = False, progreso: Optional[Callable[[Dict], None]] = None) -> Dict:
+        t0 = time.perf_counter()
+        stats = {"lotes": 0, "cambios_sqlite": 0, "cambios_mysql": 0, "nombres": 0,
+                 "a_mysql": 0, "a_sqlite": 0, "conflictos": 0, "completo": completo}
+        cursores = self._estado("cursores", {"sqlite": 0, "mysql": 0})
+
+        if completo:
+            for nombres in self._todos_los_nombres():
+                self._aplicar(nombres, None, None, cursores, dict(cursores), stats)
+                stats["lotes"] += 1
+                if progreso:
+                    progreso(dict(stats))
+
+        while True:
+            cs = self._cambios_sqlite(cursores["sqlite"])
+            cm = self._cambios_mysql(cursores["mysql"])
+            if not cs and not cm:
+                break
+            nombres = sorted({r[1] for r in cs} | {r[1] for r in cm})
+            ts_s, ts_m = self._ts_pendientes(nombres, cursores)
+            consumido = {"sqlite": cs[-1][0] if cs else cursores["sqlite"],
+                         "mysql": cm[-1][0] if cm else cursores["mysql"]}
+            self._aplicar(nombres, ts_s, ts_m, cursores, consumido, stats)
+            stats["lotes"] += 1
+            stats["cambios_sqlite"] += len(cs)
+            stats["cambios_mysql"] += len(cm)
+            if progreso:
+                progreso(dict(stats))
+
+        stats["segundos"] = round(time.perf_counter() - t0, 3)
+        stats["nombres_por_seg"] = round(stats["nombres"] / stats["segundos"], 1) if stats["segundos"] else 0.0
+        stats["fin"] = time.time()
+        s = self.get_sqlite()
+        self._guardar(s, "ultima", stats)
+        s.commit()
+        return stats
@@ -0,0 +1,87 @@
+# sqlite_db.py
+# Conexiones SQLite gestionadas para inventario.db: una por hilo y archivo,
+# reutilizada entre peticiones, con WAL (lectores y escritor no se bloquean),
+# synchronous=NORMAL, busy_timeout, mmap y caché de sentencias más grande.
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+BUSY_TIMEOUT_MS = 5000
+CACHED_STATEMENTS = 256
+PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "busy_timeout": BUSY_TIMEOUT_MS,
+    "mmap_size": 256 * 1024 * 1024,
+    "cache_size": -16000,          # ~16 MB de páginas en caché
+    "temp_store": "MEMORY",
+}
+
+_local = threading.local()
+
+# Si se asigna, recibe (path, sql, params, segundos) por cada execute/executemany
+# hecho sobre la conexión (no cubre la lectura posterior de las filas).
+observador: Optional[Callable[[str, str, object, float], None]] = None
+
+
+class _Conexion(sqlite3.Connection):
+    def __init__(self, path, *args, **kwargs):
+        super().__init__(path, *args, **kwargs)
+        self.path = os.path.basename(str(path))
+
+    def _medir(self, metodo, sql, params):
+        obs = observador
+        if obs is None:
+            return metodo(sql, params)
+        t0 = time.perf_counter()
+        try:
+            return metodo(sql, params)
+        finally:
+            obs(self.path, sql, params, time.perf_counter() - t0)
+
+    def execute(self, sql, params=()):
+        return self._medir(super().execute, sql, params)
+
+    def executemany(self, sql, seq):
+        return self._medir(super().executemany, sql, seq)
+
+
+def _abrir(path: str, pragmas: Dict[str, object]) -> sqlite3.Connection:
+    conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT_MS / 1000, cached_statements=CACHED_STATEMENTS,
+                           factory=_Conexion)
+    conn.row_factory = sqlite3.Row
+    for nombre, valor in pragmas.items():
+        conn.execute(f"PRAGMA {nombre}={valor}")
+    return conn
+
+
+def conectar(path: str, pragmas: Dict[str, object] = PRAGMAS) -> sqlite3.Connection:
+    """
+    Conexión del hilo actual para `path` (se crea la primera vez). No hay que
+    cerrarla: vive lo que el hilo; `finalizar()` descarta transacciones abiertas.
+    """
+    conns = getattr(_local, "conns", None)
+    if conns is None or getattr(_local, "pid", None) != os.getpid():
+        # Tras un fork no se reutilizan conexiones del padre
+        conns = _local.conns = {}
+        _local.pid = os.getpid()
+    conn = conns.get(path)
+    if conn is None:
+        conn = conns[path] = _abrir(path, pragmas)
+    return conn
+
+
+def finalizar(exc=None) -> None:
+    """Para teardown: una petición que falló a mitad no deja su transacción al siguiente uso."""
+    for conn in (getattr(_local, "conns", None) or {}).values():
+        if conn.in_transaction:
+            conn.rollback()
+
+
+def cerrar_todas() -> None:
+    """Cierra las conexiones del hilo actual (tests, CLI, tras cambiar de archivo)."""
+    for conn in (getattr(_local, "conns", None) or {}).values():
+        conn.close()
+    _local.conns = {}
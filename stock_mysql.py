@@ -0,0 +1,127 @@
+# stock_mysql.py
+# Movimientos de stock como deltas atómicos sobre MySQL `productos`:
+#   - los deltas del mismo id_producto se suman en memoria (un solo UPDATE por id)
+#   - las filas se bloquean (SELECT ... FOR UPDATE) en orden de clave y por
+#     trozos: dos llamadas concurrentes siempre piden los bloqueos en el mismo
+#     orden y no pueden cruzarse en un deadlock
+#   - un producto cuyo stock quedaría negativo se rechaza entero; el resto se aplica
+#   - cada movimiento aceptado queda en `movimientos_stock` (libro de solo
+#     inserción: la aplicación nunca lo actualiza ni lo borra)
+# Todo en una transacción: stock y libro cambian juntos o no cambian.
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+TROZO = 500
+
+MOVIMIENTOS_DDL = """
+CREATE TABLE IF NOT EXISTS movimientos_stock (
+    id BIGINT NOT NULL AUTO_INCREMENT PRIMARY KEY,
+    id_producto INT NOT NULL,
+    delta INT NOT NULL,
+    stock_resultante INT NOT NULL,
+    motivo VARCHAR(100) NOT NULL DEFAULT '',
+    usuario_id INT NULL,
+    creado TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    KEY ix_movimientos_producto (id_producto, id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+"""
+
+
+def crear_libro(conn) -> None:
+    cur = conn.cursor()
+    cur.execute(MOVIMIENTOS_DDL)
+    cur.close()
+
+
+def _entero(x, nombre: str) -> int:
+    try:
+        ok = not isinstance(x, bool) and int(x) == float(x)
+    except (TypeError, ValueError, OverflowError):
+        ok = False
+    if not ok:
+        raise ValueError(f"{nombre} debe ser entero")
+    return int(x)
+
+
+def aplicar_deltas(conn, movimientos: List[Any], usuario_id: Optional[int] = None) -> Dict[str, Any]:
+    """
+    `movimientos`: [{"id_producto": 1, "delta": -3, "motivo": "venta"}, ...].
+    Devuelve {"productos": [{id_producto, delta, stock, ok | error}], "movimientos": [...], "resumen": {...}};
+    "movimientos" lleva un resultado por elemento de entrada, en orden.
+    """
+    res_mov: List[Optional[dict]] = [None] * len(movimientos)
+    por_id: "OrderedDict[int, List[tuple]]" = OrderedDict()   # id -> [(índice, delta, motivo)]
+    for i, m in enumerate(movimientos):
+        try:
+            if not isinstance(m, dict):
+                raise ValueError("se esperaba un objeto")
+            pid = _entero(m.get("id_producto"), "id_producto")
+            delta = _entero(m.get("delta"), "delta")
+            if delta == 0:
+                raise ValueError("delta no puede ser 0")
+            por_id.setdefault(pid, []).append((i, delta, str(m.get("motivo") or "")[:100]))
+        except ValueError as e:
+            res_mov[i] = {"ok": False, "error": str(e)}
+
+    productos: List[dict] = []
+    ids = sorted(por_id)
+    cur = conn.cursor()
+    try:
+        for k in range(0, len(ids), TROZO):
+            trozo = ids[k:k + TROZO]
+            marcas = ", ".join(["%s"] * len(trozo))
+            cur.execute(f"SELECT id_producto, stock FROM productos WHERE id_producto IN ({marcas}) "
+                        f"ORDER BY id_producto FOR UPDATE", trozo)
+            stock = {r[0]: int(r[1]) for r in cur.fetchall()}
+
+            aplicar, libro = [], []
+            for pid in trozo:
+                total = sum(d for _, d, _ in por_id[pid])
+                if pid not in stock:
+                    error = "no existe"
+                elif stock[pid] + total < 0:
+                    error = f"stock insuficiente (hay {stock[pid]}, delta {total})"
+                else:
+                    error = None
+                if error:
+                    productos.append({"id_producto": pid, "delta": total, "ok": False, "error": error})
+                    for i, _, _ in por_id[pid]:
+                        res_mov[i] = {"ok": False, "error": error}
+                    continue
+                if total:
+                    aplicar.append((pid, total))
+                actual = stock[pid]
+                for i, d, motivo in por_id[pid]:
+                    actual += d
+                    libro.append((pid, d, actual, motivo, usuario_id))
+                    res_mov[i] = {"ok": True, "id_producto": pid, "stock": actual}
+                productos.append({"id_producto": pid, "delta": total, "stock": actual, "ok": True})
+
+            if aplicar:
+                # Un UPDATE por trozo (solo ids con suma != 0: así filas afectadas == filas esperadas);
+                # la guarda >= 0 se mantiene aunque las filas ya estén bloqueadas
+                casos = " ".join(["WHEN %s THEN %s"] * len(aplicar))
+                ids_ok = [pid for pid, _ in aplicar]
+                cur.execute(
+                    f"UPDATE productos SET stock = stock + CASE id_producto {casos} END "
+                    f"WHERE id_producto IN ({', '.join(['%s'] * len(ids_ok))}) "
+                    f"AND stock + CASE id_producto {casos} END >= 0",
+                    [v for par in aplicar for v in par] + ids_ok + [v for par in aplicar for v in par])
+                if cur.rowcount != len(aplicar):
+                    raise RuntimeError("el stock cambió durante el lote")
+            if libro:
+                fila = "(%s, %s, %s, %s, %s)"
+                cur.execute("INSERT INTO movimientos_stock (id_producto, delta, stock_resultante, motivo, usuario_id) "
+                            f"VALUES {', '.join([fila] * len(libro))}", [v for f in libro for v in f])
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+
+    ok = sum(1 for p in productos if p["ok"])
+    return {"productos": productos, "movimientos": res_mov,
+            "resumen": {"productos_ok": ok, "productos_error": len(productos) - ok,
+                        "movimientos": len(movimientos),
+                        "movimientos_ok": sum(1 for r in res_mov if r["ok"])}}
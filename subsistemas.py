@@ -0,0 +1,83 @@
+# subsistemas.py
+# Inicialización perezosa para que importar app.py sea barato (gunicorn
+# --preload, arranque de workers): las dependencias pesadas y los recursos
+# (motores, archivos, conexiones) se crean la primera vez que se usan, una
+# vez por proceso; tras un fork el hijo crea los suyos.
+#   - Perezoso("modulo"): el import ocurre al acceder al primer atributo.
+#   - Subsistema(nombre, fabrica): objeto único por proceso creado con fabrica().
+import importlib
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+_REGISTRO: Dict[str, "Subsistema"] = {}
+_tiempos_import: Dict[str, float] = {}
+
+
+class Perezoso:
+    """Módulo que se importa en el primer acceso a un atributo."""
+
+    def __init__(self, nombre: str):
+        self.__dict__["_nombre"] = nombre
+        self.__dict__["_modulo"] = None
+
+    def _cargar(self):
+        mod = self.__dict__["_modulo"]
+        if mod is None:
+            t0 = time.perf_counter()
+            mod = self.__dict__["_modulo"] = importlib.import_module(self.__dict__["_nombre"])
+            _tiempos_import[self.__dict__["_nombre"]] = round((time.perf_counter() - t0) * 1000, 1)
+        return mod
+
+    def __getattr__(self, atributo):
+        return getattr(self._cargar(), atributo)
+
+    def __setattr__(self, atributo, valor):
+        setattr(self._cargar(), atributo, valor)
+
+
+class Subsistema:
+    """
+    Recurso único por proceso: fabrica() se llama en el primer get() y otra
+    vez si el pid cambió (fork). cerrar(obj) opcional para reset().
+    """
+
+    def __init__(self, nombre: str, fabrica: Callable[[], Any], cerrar: Optional[Callable[[Any], None]] = None):
+        self.nombre = nombre
+        self.fabrica = fabrica
+        self.cerrar = cerrar
+        self._obj = None
+        self._pid = None
+        self._ms = None
+        self._lock = threading.Lock()
+        _REGISTRO[nombre] = self
+
+    def get(self) -> Any:
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    t0 = time.perf_counter()
+                    self._obj = self.fabrica()
+                    self._ms = round((time.perf_counter() - t0) * 1000, 1)
+                    self._pid = os.getpid()
+        return self._obj
+
+    @property
+    def iniciado(self) -> bool:
+        return self._pid == os.getpid()
+
+    def reset(self) -> None:
+        """Descarta el objeto (p. ej. tras cambiar la configuración); el próximo get() lo recrea."""
+        with self._lock:
+            if self.iniciado and self.cerrar is not None:
+                self.cerrar(self._obj)
+            self._obj = self._pid = self._ms = None
+
+
+def estado() -> Dict[str, Any]:
+    """Qué se inicializó en este proceso y cuánto costó (ms)."""
+    return {"pid": os.getpid(),
+            "subsistemas": {n: {"iniciado": s.iniciado, "ms": s._ms if s.iniciado else None}
+                            for n, s in sorted(_REGISTRO.items())},
+            "imports_diferidos_ms": dict(_tiempos_import)}
@@ -0,0 +1,57 @@
+# totales.py
+# Agregados materializados del inventario (SQLite): nº de productos, unidades
+# y valor total en una fila que mantienen los triggers de productos, para que
+# la portada no tenga que recorrer el catálogo.
+from typing import Dict
+
+TOTALES_DDL = [
+    """CREATE TABLE IF NOT EXISTS inventario_totales(
+        id        INTEGER PRIMARY KEY CHECK(id = 1),
+        productos INTEGER NOT NULL,
+        unidades  INTEGER NOT NULL,
+        valor     REAL NOT NULL
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS productos_tot_ai AFTER INSERT ON productos BEGIN
+        UPDATE inventario_totales SET productos = productos + 1,
+            unidades = unidades + new.cantidad, valor = valor + new.cantidad * new.precio
+        WHERE id = 1;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS productos_tot_ad AFTER DELETE ON productos BEGIN
+        UPDATE inventario_totales SET productos = productos - 1,
+            unidades = unidades - old.cantidad, valor = valor - old.cantidad * old.precio
+        WHERE id = 1;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS productos_tot_au AFTER UPDATE OF cantidad, precio ON productos BEGIN
+        UPDATE inventario_totales SET
+            unidades = unidades + new.cantidad - old.cantidad,
+            valor = valor + new.cantidad * new.precio - old.cantidad * old.precio
+        WHERE id = 1;
+    END""",
+    # Índices para ordenar la portada por cualquier columna sin ordenar toda la tabla
+    "CREATE INDEX IF NOT EXISTS ix_productos_cantidad ON productos(cantidad)",
+    "CREATE INDEX IF NOT EXISTS ix_productos_precio ON productos(precio)",
+    "CREATE INDEX IF NOT EXISTS ix_productos_subtotal ON productos(cantidad * precio)",
+]
+
+# Columnas ordenables de la portada -> expresión SQL
+ORDEN_COLUMNAS = {
+    "id": "id", "nombre": "nombre", "cantidad": "cantidad",
+    "precio": "precio", "subtotal": "cantidad * precio",
+}
+
+
+def crear_totales(conn) -> None:
+    """Crea tabla, triggers e índices y recalcula la fila exacta (corrige deriva de los REAL)."""
+    for ddl in TOTALES_DDL:
+        conn.execute(ddl)
+    conn.execute("""
+        INSERT OR REPLACE INTO inventario_totales(id, productos, unidades, valor)
+        SELECT 1, COUNT(*), COALESCE(SUM(cantidad), 0), COALESCE(SUM(cantidad * precio), 0) FROM productos
+    """)
+
+
+def leer_totales(conn) -> Dict[str, float]:
+    row = conn.execute("SELECT productos, unidades, valor FROM inventario_totales WHERE id = 1").fetchone()
+    if row is None:
+        return {"productos": 0, "unidades": 0, "valor": 0.0}
+    return {"productos": row[0], "unidades": row[1], "valor": row[2]}
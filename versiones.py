@@ -0,0 +1,91 @@
+# versiones.py
+# Contadores de cambios por tabla. Cada escritura sube la versión de las
+# tablas que toca; las cachés comparan versiones para saber si un resultado
+# sigue siendo válido. Por defecto viven en un archivo SQLite compartido por
+# todos los workers (TABLE_VERSIONS_FILE); con ":memory:" son por proceso.
+#
+# Los nombres llevan el origen delante para no mezclar tablas homónimas:
+# "mysql:productos", "sqlite:productos", "sqla:usuarios". "*" es el comodín
+# que invalida todo (escrituras cuyo destino no se pudo determinar).
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+import sqlite_db
+
+TODAS = "*"
+
+_LECTURA = re.compile(r"\b(?:FROM|JOIN)\s+`?([\w.]+)`?", re.IGNORECASE)
+_ESCRITURA = re.compile(
+    r"^\s*(?:INSERT(?:\s+IGNORE)?\s+INTO|REPLACE\s+INTO|UPDATE(?:\s+IGNORE)?|DELETE\s+FROM|TRUNCATE(?:\s+TABLE)?"
+    r"|ALTER\s+TABLE|DROP\s+TABLE(?:\s+IF\s+EXISTS)?)\s+`?([\w.]+)`?",
+    re.IGNORECASE,
+)
+
+
+def tablas_leidas(sql: str, origen: str = "mysql") -> Set[str]:
+    """Tablas de las que lee una consulta (FROM/JOIN), siempre con el comodín incluido."""
+    return {f"{origen}:{t.lower()}" for t in _LECTURA.findall(sql)} | {TODAS}
+
+
+def tablas_escritas(sql: str, origen: str = "mysql") -> Set[str]:
+    """Tablas que modifica una sentencia; si no se reconoce, el comodín (invalida todo)."""
+    m = _ESCRITURA.match(sql)
+    return {f"{origen}:{m.group(1).lower()}"} if m else {TODAS}
+
+
+class TableVersions:
+    def __init__(self, path: Optional[str] = None):
+        self._mem: Dict[str, Tuple[int, float]] = {}
+        self._lock = threading.Lock()
+        self.usar(path)
+
+    def usar(self, path: Optional[str]) -> None:
+        """Cambia el archivo de versiones; se abre (y se crea la tabla) en el primer uso."""
+        self.path = None if path in (None, ":memory:") else str(path)
+        self._listo = False
+
+    def _conn(self):
+        conn = sqlite_db.conectar(self.path)
+        if not self._listo:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            conn.execute("""CREATE TABLE IF NOT EXISTS tabla_versiones(
+                tabla TEXT PRIMARY KEY, version INTEGER NOT NULL, modificado REAL NOT NULL)""")
+            conn.commit()
+            self._listo = True
+        return conn
+
+    def get(self, tablas: Iterable[str]) -> Dict[str, Tuple[int, float]]:
+        """{tabla: (versión, epoch de la última modificación)}; las nunca tocadas valen (0, 0.0)."""
+        tablas = sorted(set(tablas))
+        if not self.path:
+            with self._lock:
+                return {t: self._mem.get(t, (0, 0.0)) for t in tablas}
+        rows = self._conn().execute(
+            f"SELECT tabla, version, modificado FROM tabla_versiones WHERE tabla IN ({','.join('?' * len(tablas))})",
+            tablas
+        ).fetchall()
+        found = {r[0]: (r[1], r[2]) for r in rows}
+        return {t: found.get(t, (0, 0.0)) for t in tablas}
+
+    def bump(self, tablas: Iterable[str]) -> None:
+        ahora = time.time()
+        if not self.path:
+            with self._lock:
+                for t in set(tablas):
+                    self._mem[t] = (self._mem.get(t, (0, 0.0))[0] + 1, ahora)
+            return
+        conn = self._conn()
+        with conn:
+            conn.executemany(
+                "INSERT INTO tabla_versiones(tabla, version, modificado) VALUES (?, 1, ?) "
+                "ON CONFLICT(tabla) DO UPDATE SET version = version + 1, modificado = excluded.modificado",
+                [(t, ahora) for t in set(tablas)]
+            )
+
+
+versiones = TableVersions(os.environ.get(
+    "TABLE_VERSIONS_FILE", str(Path(__file__).parent / "database" / "versiones.db")))